@@ -0,0 +1,444 @@
+"""Reproducible benchmarks for opportunity search and resume parsing
+
+Generates synthetic opportunity corpora and synthetic resumes (TXT, DOCX and
+PDF, with and without section headers) from a fixed seed, then measures
+throughput, p50/p99 latency and peak traced memory for:
+
+- the opportunity endpoints (GET /api/opportunities, GET /api/opportunity/<id>,
+  POST /api/search, POST /api/match) at each corpus size
+- POST /api/resume/parse and each text extractor, the spaCy parse, section
+  segmentation and the six section extractors
+
+Response and parse caches are disabled so every call does the full work.
+
+Usage:
+    python benchmark.py run --output results.json [--sizes 1000,10000,100000]
+    python benchmark.py compare old.json new.json
+
+The spaCy model is SPACY_MODEL when installed, else en_core_web_sm, else a
+blank English pipeline with a sentencizer (recorded in the results), so the
+suite runs offline.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Benchmarks measure uncached work; set before the parser reads its settings
+os.environ['RESUME_CACHE_DB'] = ''
+os.environ['RESUME_CACHE_SIZE'] = '0'
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_SEED = 42
+
+UNIVERSITIES = [
+    'Stanford University', 'MIT', 'Harvard University', 'University of California, Berkeley',
+    'ETH Zurich', 'University of Cambridge', 'University of Oxford', 'TU Delft', 'EPFL',
+    'University of Toronto', 'National University of Singapore', 'University of Tokyo',
+    'Imperial College London', 'Carnegie Mellon University', 'University of Melbourne',
+]
+DEPARTMENTS = [
+    'Computer Science', 'Physics', 'Biomedical Engineering', 'Electrical Engineering',
+    'Mechanical Engineering', 'Chemistry', 'Mathematics', 'Oceanography', 'Economics',
+    'Materials Science', 'Neuroscience', 'Civil Engineering',
+]
+TOPICS = [
+    'machine learning', 'climate modelling', 'quantum computing', 'drug discovery',
+    'natural language processing', 'computer vision', 'robotics', 'renewable energy',
+    'graph neural networks', 'reinforcement learning', 'protein folding', 'optimization',
+    'distributed systems', 'cryptography', 'ocean carbon', 'materials discovery',
+    'computational biology', 'fluid dynamics', 'causal inference', 'speech recognition',
+    'battery chemistry', 'epidemiology', 'signal processing', 'compilers',
+]
+FUNDING = ['Fully funded', 'Fully funded with stipend', 'Partial funding available', 'Self funded']
+WORDS = (
+    'research develop novel methods models data analysis systems study design scalable '
+    'efficient robust theory experiments simulation applications students group project '
+    'collaborate industry partners interdisciplinary team publish conferences journals '
+    'opportunity candidates strong background experience programming mathematics '
+    'statistics algorithms hardware software sensors measurements field laboratory'
+).split()
+SKILLS = [
+    'Python', 'Java', 'C++', 'SQL', 'Docker', 'Kubernetes', 'PyTorch', 'TensorFlow',
+    'machine learning', 'data science', 'statistics', 'Excel', 'Git', 'AWS', 'React',
+    'deep learning', 'NLP', 'computer vision', 'Tableau', 'MATLAB',
+]
+
+
+def generate_opportunities(count, seed=DEFAULT_SEED):
+    """Synthetic opportunity records, identical for the same count and seed"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(1, count + 1):
+        topics = rng.sample(TOPICS, 2)
+        records.append({
+            'id': i,
+            'title': f"{topics[0].title()} for {topics[1].title()}",
+            'university': rng.choice(UNIVERSITIES),
+            'department': rng.choice(DEPARTMENTS),
+            'location': rng.choice(['Europe', 'North America', 'Asia', 'Australia']),
+            'description': ' '.join(rng.choices(WORDS, k=40) + topics),
+            'requirements': [f"MS in {rng.choice(DEPARTMENTS)}", f"Experience with {rng.choice(SKILLS)}"],
+            'deadline': f"2027-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'posted_date': f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}",
+            'funding': rng.choice(FUNDING),
+            'tags': [topic.title() for topic in topics],
+        })
+    return records
+
+
+def generate_resume(seed, headers=True, entries=3):
+    """Synthetic resume text; entries scales the experience section"""
+    rng = random.Random(seed)
+    sections = [
+        ('EDUCATION', [
+            f"MS {rng.choice(DEPARTMENTS)}, {rng.choice(UNIVERSITIES)}, {rng.randint(2015, 2024)}",
+            f"BSc {rng.choice(DEPARTMENTS)}, {rng.choice(UNIVERSITIES)}, {rng.randint(2010, 2020)}",
+        ]),
+        ('EXPERIENCE', [
+            f"Research Assistant, {rng.choice(UNIVERSITIES)} ({2010 + i} - {2011 + i}): "
+            + ' '.join(rng.choices(WORDS, k=25)) + '.'
+            for i in range(entries)
+        ]),
+        ('SKILLS', [', '.join(rng.sample(SKILLS, 8))]),
+        ('CERTIFICATIONS', [f"Certified {rng.choice(SKILLS)} practitioner", "AWS certification, 2022"]),
+        ('ACHIEVEMENTS', [f"Received the {rng.choice(TOPICS)} award in {rng.randint(2015, 2024)}",
+                          "Selected for a graduate research fellowship"]),
+        ('QUALIFICATIONS', [f"Proficient in {rng.choice(SKILLS)} and {rng.choice(SKILLS)}"]),
+    ]
+
+    lines = [f"Candidate {seed}", f"candidate{seed}@example.com", ""]
+    for header, body in sections:
+        if headers:
+            lines.append(header)
+        lines.extend(body)
+        lines.append("")
+    return '\n'.join(lines)
+
+
+def resume_docx(text):
+    """DOCX bytes with one paragraph per line"""
+    from docx import Document
+
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def resume_pdf(text, lines_per_page=60, width=95):
+    """Minimal PDF bytes (Helvetica text) with the lines of text"""
+    lines = []
+    for line in text.split('\n'):
+        while len(line) > width:
+            lines.append(line[:width])
+            line = line[width:]
+        lines.append(line)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    for page in pages:
+        escaped = [line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in page]
+        stream = ('BT /F1 10 Tf 12 TL 50 800 Td ' + ' '.join(f'({line}) Tj T*' for line in escaped) + ' ET').encode('latin-1', 'replace')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        content_id = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+        )
+        page_ids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % page_id for page_id in page_ids), len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def generate_resumes(count, seed=DEFAULT_SEED):
+    """{(format, variant): [bytes, ...]} for every format and header/length variant"""
+    resumes = {}
+    for headers in (True, False):
+        for length, entries in (('short', 3), ('long', 40)):
+            variant = f"{'headers' if headers else 'no-headers'}/{length}"
+            texts = [generate_resume(seed + i, headers, entries) for i in range(count)]
+            resumes[('.txt', variant)] = [text.encode('utf-8') for text in texts]
+            resumes[('.docx', variant)] = [resume_docx(text) for text in texts]
+            resumes[('.pdf', variant)] = [resume_pdf(text) for text in texts]
+    return resumes
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def measure(name, func, inputs, warmup=3, **labels):
+    """Time func over inputs, then rerun once under tracemalloc for peak memory"""
+    inputs = list(inputs)
+    for item in inputs[:warmup]:
+        func(item)
+
+    latencies = []
+    started = time.perf_counter()
+    for item in inputs:
+        call_started = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            func(item)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    result = {
+        'name': name,
+        **labels,
+        'calls': len(inputs),
+        'throughput_per_second': round(len(inputs) / elapsed, 2) if elapsed else None,
+        'mean_ms': round(elapsed / len(inputs) * 1000, 4) if inputs else 0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+        'peak_memory_bytes': peak,
+    }
+    print(f"{name:<40} {json.dumps(labels):<45} p50 {result['p50_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms",
+          file=sys.stderr)
+    return result
+
+
+def load_benchmark_model(preferred=None):
+    """Install a spaCy pipeline for the parser: preferred, then small, then blank; returns its name"""
+    import spacy
+    import resume_parser
+
+    for name in (preferred or resume_parser.SPACY_MODEL, 'en_core_web_sm'):
+        try:
+            resume_parser._nlp = spacy.load(name)
+            return name
+        except (OSError, ImportError):
+            continue
+
+    nlp = spacy.blank('en')
+    nlp.add_pipe('sentencizer')
+    resume_parser._nlp = nlp
+    return 'blank:en+sentencizer'
+
+
+def create_app(engine):
+    """Flask app with the same blueprints and settings as app.py, serving engine"""
+    from flask import Flask
+    from opportunities.flask_api import FastJSONProvider, create_blueprint
+    from resume_parser import UploadRequest, resume_bp
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.request_class = UploadRequest
+    app.register_blueprint(resume_bp, url_prefix='/api/resume')
+    app.register_blueprint(create_blueprint(engine), url_prefix='/api')
+    return app
+
+
+def check(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.request.path} returned {response.status_code}: {response.get_data()[:200]!r}")
+    return response
+
+
+def bench_opportunities(sizes, calls, seed):
+    """Benchmark the opportunity endpoints at each corpus size"""
+    from opportunities import QueryEngine
+
+    results = []
+    rng = random.Random(seed)
+    for size in sizes:
+        records = generate_opportunities(size, seed)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        engine = QueryEngine(records, cache_size=0)
+        build_seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({
+            'name': 'engine build', 'corpus': size,
+            'seconds': round(build_seconds, 4), 'peak_memory_bytes': peak,
+        })
+        print(f"{'engine build':<40} {json.dumps({'corpus': size}):<45} {build_seconds:.2f} s", file=sys.stderr)
+
+        started = time.perf_counter()
+        engine.matcher.build()
+        results.append({
+            'name': 'match vectors build', 'corpus': size,
+            'seconds': round(time.perf_counter() - started, 4),
+        })
+
+        client = create_app(engine).test_client()
+        topics = [rng.choice(TOPICS) for _ in range(calls)]
+        prefixes = [topic.split()[0][:4] for topic in topics]
+        ids = [rng.randint(1, size) for _ in range(calls)]
+
+        cases = [
+            ('GET /api/opportunities', 'first page', lambda i: client.get('/api/opportunities')),
+            ('GET /api/opportunities', 'query', lambda i: client.get('/api/opportunities', query_string={'query': topics[i]})),
+            ('GET /api/opportunities', 'prefix', lambda i: client.get('/api/opportunities', query_string={'query': prefixes[i]})),
+            ('GET /api/opportunity/<id>', 'by id', lambda i: client.get(f'/api/opportunity/{ids[i]}')),
+            ('POST /api/search', 'keywords', lambda i: client.post('/api/search', json={'keywords': topics[i]})),
+            ('POST /api/search', 'keywords + filters', lambda i: client.post('/api/search', json={
+                'keywords': topics[i], 'university': UNIVERSITIES[i % len(UNIVERSITIES)], 'funding': 'funded'})),
+            ('POST /api/match', 'resume text', lambda i: client.post('/api/match', json={
+                'text': generate_resume(seed + i)})),
+        ]
+        for name, variant, call in cases:
+            results.append(measure(name, lambda i: check(call(i)), range(calls), corpus=size, variant=variant))
+    return results
+
+
+def bench_resumes(count, seed):
+    """Benchmark resume parsing end to end and stage by stage"""
+    import resume_parser as rp
+    from opportunities import QueryEngine
+    from resume_sections import segment_sections
+
+    results = []
+    client = create_app(QueryEngine([], cache_size=0)).test_client()
+    extract = {'.txt': rp.extract_text_from_txt, '.docx': rp.extract_text_from_docx, '.pdf': rp.extract_text_from_pdf}
+
+    for (file_ext, variant), files in generate_resumes(count, seed).items():
+        labels = {'format': file_ext, 'variant': variant}
+
+        results.append(measure('POST /api/resume/parse', lambda data: check(client.post(
+            '/api/resume/parse', data={'file': (io.BytesIO(data), f'resume{file_ext}')},
+            content_type='multipart/form-data')), files, **labels))
+
+        results.append(measure(extract[file_ext].__name__, lambda data: extract[file_ext](io.BytesIO(data)),
+                               files, **labels))
+
+        # Section extractors run over already extracted text and a shared parse
+        if file_ext != '.txt':
+            continue
+        texts = [data.decode('utf-8') for data in files]
+        results.append(measure('spacy parse', lambda text: rp.ParseContext(text).doc, texts, **labels))
+        results.append(measure('segment_sections', segment_sections, texts, **labels))
+        contexts = {text: rp.ParseContext(text) for text in texts}
+        for ctx in contexts.values():
+            ctx.sentences, ctx.sections
+        for extractor in (rp.extract_education, rp.extract_skills, rp.extract_experience,
+                          rp.extract_certificates, rp.extract_achievements, rp.extract_qualifications):
+            results.append(measure(extractor.__name__, lambda text: extractor(text, contexts[text]), texts, **labels))
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else list(DEFAULT_SIZES)
+    model = load_benchmark_model(args.model)
+
+    results = []
+    if not args.skip_search:
+        results.extend(bench_opportunities(sizes, args.calls, args.seed))
+    if not args.skip_resumes:
+        results.extend(bench_resumes(args.resumes, args.seed))
+
+    report = {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'spacy_model': model,
+            'seed': args.seed,
+            'sizes': sizes,
+            'calls': args.calls,
+            'resumes': args.resumes,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+
+def result_key(result):
+    return tuple((name, str(value)) for name, value in sorted(result.items())
+                 if name in ('name', 'corpus', 'variant', 'format'))
+
+
+def compare(args):
+    """Print p50/p99 changes between two result files"""
+    with open(args.baseline) as file:
+        baseline = {result_key(result): result for result in json.load(file)['results']}
+    with open(args.candidate) as file:
+        candidate = json.load(file)['results']
+
+    for result in candidate:
+        old = baseline.get(result_key(result))
+        if old is None or 'p50_ms' not in result:
+            continue
+        label = ' '.join(str(value) for _, value in result_key(result))
+        changes = []
+        for metric in ('p50_ms', 'p99_ms', 'peak_memory_bytes'):
+            if old.get(metric):
+                changes.append(f"{metric} {(result[metric] - old[metric]) / old[metric]:+.1%}")
+        print(f"{label:<80} {'  '.join(changes)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark opportunity search and resume parsing")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the benchmarks and write JSON results")
+    run_parser.add_argument('--output', default='benchmark_results.json')
+    run_parser.add_argument('--sizes', help="comma-separated corpus sizes (default 1000,10000,100000)")
+    run_parser.add_argument('--calls', type=int, default=200, help="calls per endpoint benchmark")
+    run_parser.add_argument('--resumes', type=int, default=20, help="resumes per format and variant")
+    run_parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    run_parser.add_argument('--model', help="spaCy model to try first (default SPACY_MODEL)")
+    run_parser.add_argument('--skip-search', action='store_true')
+    run_parser.add_argument('--skip-resumes', action='store_true')
+
+    compare_parser = commands.add_parser('compare', help="compare two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Build the semantic opportunity index offline
+
+Usage:
+    python build_semantic_index.py semantic_index/ [--scraper-state scraper_state.sqlite]
+
+Then start the API with SEMANTIC_INDEX_DIR=semantic_index to enable
+mode=semantic searches. The spaCy model (--model, default en_core_web_lg)
+must have word vectors and be installed wherever the index is used.
+"""
+import argparse
+import os
+
+from opportunities import build_semantic_index, create_engine
+from opportunities.semantic import DEFAULT_MODEL
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Embed opportunities and build the IVF index")
+    parser.add_argument('directory')
+    parser.add_argument('--scraper-state', help="also index postings from this crawl state file")
+    parser.add_argument('--model', default=os.getenv('SEMANTIC_MODEL', DEFAULT_MODEL),
+                        help="spaCy model with word vectors (default en_core_web_lg)")
+    parser.add_argument('--clusters', type=int, help="number of inverted lists (default sqrt(n))")
+    args = parser.parse_args(argv)
+
+    engine = create_engine()
+    if args.scraper_state:
+        from phd_scraper import load_scraped_opportunities
+        engine.upsert_many(load_scraped_opportunities(args.scraper_state))
+
+    _, ids = engine.store.ordered()
+    index = build_semantic_index(engine.get_many(ids), args.directory, args.model, args.clusters)
+    print(f"Indexed {len(index)} opportunities in {len(index.centroids)} lists")
+
+
+if __name__ == '__main__':
+    main()
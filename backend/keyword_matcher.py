@@ -0,0 +1,100 @@
+"""Keyword matching for the resume parser
+
+A keyword list is compiled once into a single trie-shaped regular expression,
+so checking a piece of text costs one scan no matter how many terms the list
+holds. This keeps large skill taxonomies (10k+ terms) usable.
+"""
+import re
+
+# Sentinel key marking the end of a term in the trie
+_END = ''
+
+
+def normalize_term(term):
+    """Lower-case a term and collapse internal whitespace"""
+    return ' '.join(term.lower().split())
+
+
+def _build_trie(terms):
+    """Build a character trie (nested dicts) from normalized terms"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[_END] = True
+    return trie
+
+
+def _escape(char):
+    """Escape a single trie character, letting spaces match any whitespace"""
+    return r'\s+' if char == ' ' else re.escape(char)
+
+
+def _trie_to_pattern(node):
+    """Turn a trie node into a regex fragment, or None for a bare terminal"""
+    if _END in node and len(node) == 1:
+        return None
+
+    alternatives = []
+    single_chars = []
+
+    for char in sorted(key for key in node if key != _END):
+        child = _trie_to_pattern(node[char])
+        if child is None and char != ' ':
+            single_chars.append(re.escape(char))
+        else:
+            alternatives.append(_escape(char) + (child or ''))
+
+    if len(single_chars) == 1:
+        alternatives.append(single_chars[0])
+    elif single_chars:
+        alternatives.append('[' + ''.join(single_chars) + ']')
+
+    pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+
+    if _END in node:
+        pattern = '(?:' + pattern + ')?'
+
+    return pattern
+
+
+class KeywordMatcher:
+    """Case-insensitive whole-word matcher for a fixed list of terms"""
+
+    def __init__(self, terms):
+        self.terms = sorted({normalize_term(term) for term in terms if term.strip()})
+
+        if self.terms:
+            body = _trie_to_pattern(_build_trie(self.terms))
+            # Lookarounds instead of \b so terms like "c++" and "c#" still match
+            self.pattern = re.compile(r'(?<!\w)' + body + r'(?!\w)', re.IGNORECASE)
+        else:
+            self.pattern = None
+
+    @classmethod
+    def from_file(cls, file_path):
+        """Load terms from a text file with one term per line ('#' starts a comment)"""
+        with open(file_path, 'r', encoding='utf-8') as file:
+            terms = [line.split('#', 1)[0].strip() for line in file]
+        return cls(term for term in terms if term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def search(self, text):
+        """Return the first match in text, or None"""
+        if self.pattern is None:
+            return None
+        return self.pattern.search(text)
+
+    def find_all(self, text):
+        """Return the first occurrence of every distinct term found in text"""
+        if self.pattern is None:
+            return []
+
+        found = {}
+        for match in self.pattern.finditer(text):
+            found.setdefault(normalize_term(match.group(0)), match.group(0))
+
+        return list(found.values())
@@ -0,0 +1,268 @@
+"""Prometheus-format metrics and per-request stage timing
+
+Counters and histograms are kept in process and rendered in the Prometheus
+text exposition format by /metrics. Code is timed with stage() (or the
+timed() decorator), which records wall and CPU time per stage and, inside
+collect_stages(), also hands the timings to the caller, e.g. for a
+Server-Timing header or a job's timing report.
+
+init_app() adds the /metrics route, request latency histograms for every
+endpoint, and the optional Server-Timing header (SERVER_TIMING=1).
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class for labelled metrics"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_samples(self, items):
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items]
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_samples(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'resume_stage_seconds', 'Wall time spent in each resume parsing stage', ['stage'])
+STAGE_CPU_SECONDS = REGISTRY.counter(
+    'resume_stage_cpu_seconds_total', 'CPU time spent in each resume parsing stage', ['stage'])
+TEXT_CHARACTERS = REGISTRY.histogram(
+    'resume_text_characters', 'Length of extracted resume text',
+    buckets=(500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 200000))
+PDF_PAGES = REGISTRY.histogram(
+    'resume_pdf_pages', 'Pages read from uploaded PDFs', buckets=(1, 2, 3, 5, 10, 20, 30, 50))
+CACHE_REQUESTS = REGISTRY.counter(
+    'resume_cache_requests_total', 'Parse result cache lookups', ['result'])
+REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ['method', 'endpoint', 'status'])
+
+# Stage timings of the current request or job, when collect_stages() is active
+_collected = contextvars.ContextVar('collected_stages', default=None)
+
+
+def record_stage(name, seconds, cpu_seconds):
+    """Record one timed stage"""
+    STAGE_SECONDS.observe(seconds, stage=name)
+    STAGE_CPU_SECONDS.inc(cpu_seconds, stage=name)
+    collected = _collected.get()
+    if collected is not None:
+        collected.append((name, seconds, cpu_seconds))
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as a pipeline stage"""
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+
+def timed(name):
+    """Decorator timing every call of a function as a stage"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect_stages():
+    """Collect the (name, seconds, cpu_seconds) of stages run inside the block"""
+    collected = []
+    token = _collected.set(collected)
+    try:
+        yield collected
+    finally:
+        _collected.reset(token)
+
+
+def summarize_stages(collected):
+    """Sum collected stages by name: {name: {"seconds", "cpu_seconds"}}"""
+    summary = {}
+    for name, seconds, cpu_seconds in collected:
+        entry = summary.setdefault(name, {"seconds": 0.0, "cpu_seconds": 0.0})
+        entry["seconds"] += seconds
+        entry["cpu_seconds"] += cpu_seconds
+    return {
+        name: {key: round(value, 6) for key, value in entry.items()}
+        for name, entry in summary.items()
+    }
+
+
+def record_summary(summary):
+    """Record stages summarized in another process (e.g. a job worker)"""
+    for name, entry in (summary or {}).items():
+        STAGE_SECONDS.observe(entry["seconds"], stage=name)
+        STAGE_CPU_SECONDS.inc(entry["cpu_seconds"], stage=name)
+
+
+def server_timing(collected, total=None):
+    """Format collected stages as a Server-Timing header value"""
+    entries = [
+        f'{name};dur={entry["seconds"] * 1000:.2f}'
+        for name, entry in summarize_stages(collected).items()
+    ]
+    if total is not None:
+        entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+
+def init_app(app, server_timing_header=None):
+    """Add /metrics, request latency histograms and the optional Server-Timing header to a Flask app"""
+    from flask import Response, g, request
+
+    if server_timing_header is None:
+        server_timing_header = os.getenv('SERVER_TIMING', '0') == '1'
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_stages = []
+        g.metrics_token = _collected.set(g.metrics_stages)
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(elapsed, method=request.method, endpoint=endpoint, status=response.status_code)
+
+        if server_timing_header:
+            response.headers['Server-Timing'] = server_timing(g.metrics_stages, elapsed)
+        return response
+
+    @app.teardown_request
+    def stop_collecting(exc=None):
+        token = g.pop('metrics_token', None)
+        if token is not None:
+            _collected.reset(token)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus metrics"""
+        return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+    return app
@@ -0,0 +1,235 @@
+"""Sorted date index for deadline and posted-date queries
+
+Dates are parsed once, when a record is added, into day numbers (proleptic
+Gregorian ordinals). Each field keeps one list of (day, sequence) keys sorted
+ascending, with the record ids alongside, so a range of days is two bisects
+and a slice: O(log N + k) for k results, already in date order. Records
+without a parseable date sort after every dated record.
+"""
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+DATE_FIELDS = ('deadline', 'posted_date')
+
+# sort parameter values: 'deadline' is soonest first, '-posted_date' newest first
+SORT_ORDERS = ('relevance',) + DATE_FIELDS + tuple('-' + field for field in DATE_FIELDS)
+
+# Days ahead covered by the closing-soon feed, by default and at most
+CLOSING_SOON_DAYS = 30
+MAX_CLOSING_SOON_DAYS = 365
+
+# Day number of records without a (valid) date; later than any real date
+UNDATED = date.max.toordinal() + 1
+
+
+def parse_day(value):
+    """Day number of a date, datetime or ISO string ("2025-12-15..."), or None"""
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value.strip()[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def parse_day_param(value, name):
+    """Parse a date request parameter; raises ValueError if it is not YYYY-MM-DD"""
+    if value in (None, ''):
+        return None
+    day = parse_day(value)
+    if day is None:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+    return day
+
+
+def parse_sort(value):
+    """Parse the sort parameter into (date field, descending), or None for the default order"""
+    if not value or value == 'relevance':
+        return None
+    if value not in SORT_ORDERS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_ORDERS)}")
+    return value.lstrip('-'), value.startswith('-')
+
+
+def parse_days(value):
+    """Parse the closing-soon window in days"""
+    if value in (None, ''):
+        return CLOSING_SOON_DAYS
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("days must be an integer")
+    if days < 0:
+        raise ValueError("days must not be negative")
+    return min(days, MAX_CLOSING_SOON_DAYS)
+
+
+def today():
+    """Today's day number"""
+    return date.today().toordinal()
+
+
+def start_of_today():
+    """Timestamp of local midnight"""
+    return time.mktime(date.today().timetuple())
+
+
+def format_day(day):
+    """ISO string of a day number"""
+    return date.fromordinal(day).isoformat()
+
+
+def add_days(day, days):
+    """Day number days after day"""
+    return (date.fromordinal(day) + timedelta(days=days)).toordinal()
+
+
+class DateIndex:
+    """Per-field sorted arrays of day numbers, kept in sync with a store"""
+
+    def __init__(self, fields=DATE_FIELDS):
+        self.fields = tuple(fields)
+        # field -> sorted [(day, sequence)] and the ids in the same order
+        self.keys = {field: [] for field in self.fields}
+        self.ids = {field: [] for field in self.fields}
+        # field -> {doc_id: (day, sequence)}
+        self.doc_keys = {field: {} for field in self.fields}
+        # doc_id -> insertion sequence, the tie-break within a day
+        self.sequence = {}
+        self._next_sequence = 0
+
+    def __len__(self):
+        return len(self.sequence)
+
+    def add_many(self, records):
+        """Index many records, sorting each array once at the end when the batch is large"""
+        records = list(records)
+        if len(records) * 8 < len(self.sequence):
+            for record in records:
+                self.add(record)
+            return
+
+        for record in records:
+            self.add(record, _insert=False)
+        for field in self.fields:
+            entries = sorted((key, doc_id) for doc_id, key in self.doc_keys[field].items())
+            self.keys[field] = [key for key, _ in entries]
+            self.ids[field] = [doc_id for _, doc_id in entries]
+
+    def add(self, record, _insert=True):
+        """Index a record, replacing any previous version with the same id"""
+        doc_id = record['id']
+        if doc_id in self.sequence:
+            self._remove_keys(doc_id, _insert)
+        else:
+            self.sequence[doc_id] = self._next_sequence
+            self._next_sequence += 1
+
+        sequence = self.sequence[doc_id]
+        for field in self.fields:
+            day = parse_day(record.get(field))
+            key = (UNDATED if day is None else day, sequence)
+            self.doc_keys[field][doc_id] = key
+            if _insert:
+                position = bisect_left(self.keys[field], key)
+                self.keys[field].insert(position, key)
+                self.ids[field].insert(position, doc_id)
+
+    def remove(self, doc_id):
+        """Drop a record from every array"""
+        if doc_id not in self.sequence:
+            return
+        self._remove_keys(doc_id, True)
+        del self.sequence[doc_id]
+
+    def _remove_keys(self, doc_id, from_arrays):
+        for field in self.fields:
+            key = self.doc_keys[field].pop(doc_id)
+            if from_arrays:
+                position = bisect_left(self.keys[field], key)
+                del self.keys[field][position]
+                del self.ids[field][position]
+
+    def day(self, field, doc_id):
+        """Day number of a record's field, or None if it has no date"""
+        day = self.doc_keys[field][doc_id][0]
+        return None if day == UNDATED else day
+
+    def range(self, field, start=None, end=None):
+        """(keys, ids) of the records with start <= day <= end, in date order
+
+        Both bounds are inclusive day numbers. Undated records are only
+        included when end is UNDATED.
+        """
+        keys = self.keys[field]
+        low = 0 if start is None else bisect_left(keys, (start,))
+        high = bisect_left(keys, (UNDATED if end is None else end + 1,), low)
+        return keys[low:high], self.ids[field][low:high]
+
+    def count(self, field, start=None, end=None):
+        """Number of records range(field, start, end) would return, in O(log N)"""
+        keys = self.keys[field]
+        low = 0 if start is None else bisect_left(keys, (start,))
+        return bisect_left(keys, (UNDATED if end is None else end + 1,), low) - low
+
+    def sort_key(self, field, doc_id, descending=False):
+        """Sort key ordering records by field; undated records always come last"""
+        day, sequence = self.doc_keys[field][doc_id]
+        if not descending:
+            return day, sequence
+        return (UNDATED if day == UNDATED else -day), -sequence
+
+    def walk(self, field, descending=False, start=None, end=UNDATED, after=None):
+        """Yield (sort key, id) of the records with start <= day <= end, in result order
+
+        Bounds are as for range. after is the sort key of the last record
+        already returned (a decoded cursor): the walk begins right after it,
+        with a bisect, and reads the arrays in place, so taking k records
+        costs O(log N + k) however many records are in range. Raises
+        ValueError for a cursor that is not a key of this order.
+        """
+        keys, ids = self.keys[field], self.ids[field]
+        low = 0 if start is None else bisect_left(keys, (start,))
+        high = bisect_left(keys, (UNDATED if end is None else end + 1,), low)
+        try:
+            if not descending:
+                if after is not None:
+                    low = max(low, bisect_right(keys, tuple(after)))
+                for position in range(low, high):
+                    yield keys[position], ids[position]
+                return
+
+            # Latest first, then the undated records (latest added first)
+            split = bisect_left(keys, (UNDATED,), low, high)
+            dated_end, undated_end = split, high
+            if after is not None:
+                day, sequence = after
+                if day == UNDATED:
+                    dated_end = low
+                    undated_end = min(high, bisect_left(keys, (UNDATED, -sequence)))
+                else:
+                    dated_end = min(split, bisect_left(keys, (-day, -sequence)))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        for position in range(dated_end - 1, low - 1, -1):
+            yield self.sort_key(field, ids[position], True), ids[position]
+        for position in range(undated_end - 1, max(split, low) - 1, -1):
+            yield self.sort_key(field, ids[position], True), ids[position]
+
+    def ordered(self, field, descending=False, ids=None):
+        """(keys, ids) of ids (every record by default) sorted by field"""
+        if ids is None:
+            keys, ids = self.keys[field], self.ids[field]
+            if not descending:
+                return list(keys), list(ids)
+            # Latest first, then the undated records
+            split = bisect_left(keys, (UNDATED,))
+            ids = ids[:split][::-1] + ids[split:][::-1]
+        else:
+            ids = sorted(ids, key=lambda doc_id: self.sort_key(field, doc_id, descending))
+        return [self.sort_key(field, doc_id, descending) for doc_id in ids], ids
@@ -0,0 +1,222 @@
+"""Flask adapter for the opportunity query engine
+
+List endpoints return a plain JSON list; the total and the next-page cursor
+travel in the X-Total-Count, X-Next-Cursor and Link headers. Requests asking
+for facet counts (facets=1) get the serverless {"message", "data", "total",
+"next_cursor", "facets"} envelope instead.
+"""
+from functools import wraps
+
+from flask import Blueprint, jsonify, make_response, request, url_for
+from flask.json.provider import DefaultJSONProvider
+
+from .engine import BATCH_LOOKUP_LIMIT
+from .http_cache import MIN_COMPRESS_SIZE, cache_headers, choose_encoding, compress, is_not_modified, make_etag
+from .matching import MATCH_RETRY_AFTER, MatcherNotReady
+from .response_cache import CachedResponse, normalize_params
+from .serializer import dumps, envelope
+from .store import parse_ids
+
+# Headers exposed to browsers through CORS
+EXPOSED_HEADERS = ['X-Total-Count', 'X-Next-Cursor', 'Link']
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson when it is installed"""
+
+    def dumps(self, obj, **kwargs):
+        # Pretty-printed (debug) output still goes through the json module
+        if kwargs.get('indent') is not None:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, default=self.default).decode('utf-8')
+
+
+def request_params():
+    """Query parameters, plus the JSON body's for POST requests"""
+    params = request.args.to_dict()
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            params.update(body)
+    return params
+
+
+def create_blueprint(engine):
+    """Create the /api opportunity blueprint serving from engine"""
+    bp = Blueprint('opportunities', __name__)
+
+    def conditional_get(view):
+        """Answer conditional GETs with 304 and add validators keyed by the dataset version"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = make_etag(engine.version, request.full_path)
+            headers = cache_headers(etag, engine.modified_at)
+
+            # Checked before the view runs, so a 304 costs no search or serialization
+            if is_not_modified(request.headers.get('If-None-Match'),
+                               request.headers.get('If-Modified-Since'),
+                               etag, engine.modified_at):
+                return '', 304, headers
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.headers.update(headers)
+            return response
+        return wrapper
+
+    def cached_response(view):
+        """Serve repeated requests from pre-serialized bytes in the engine's cache"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = normalize_params(request.path, {**request_params(), **kwargs})
+            error = []
+
+            def build():
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    error.append(response)
+                    return None
+                return CachedResponse(
+                    response.get_data(),
+                    {name: response.headers[name] for name in EXPOSED_HEADERS if name in response.headers}
+                )
+
+            entry = engine.cached(key, build)
+            if entry is None:
+                return error[0]
+
+            # Reuse the cached compressed body too, if the client accepts one
+            encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+            if len(entry.body) < MIN_COMPRESS_SIZE:
+                encoding = None
+
+            response = make_response(entry.encoded(encoding))
+            response.headers.update(entry.headers)
+            response.mimetype = 'application/json'
+            response.vary.add('Accept-Encoding')
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+            return response
+        return wrapper
+
+    @bp.after_request
+    def compress_response(response):
+        """Compress larger responses with brotli or gzip according to Accept-Encoding"""
+        if (response.direct_passthrough or response.status_code != 200
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        body = response.get_data()
+
+        if encoding and len(body) >= MIN_COMPRESS_SIZE:
+            response.set_data(compress(body, encoding))
+            response.headers['Content-Encoding'] = encoding
+
+        return response
+
+    def page_response(params, endpoint=None, run=None):
+        """Run a query (engine.search by default) and return one page as a list with paging headers"""
+        try:
+            page = (run or engine.search)(params)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if page.facets is None:
+            response = jsonify(page.items)
+        else:
+            response = jsonify(envelope(page.items, total=page.total, next_cursor=page.next_cursor,
+                                        facets=page.facets))
+        response.headers['X-Total-Count'] = str(page.total)
+
+        if page.next_cursor:
+            response.headers['X-Next-Cursor'] = page.next_cursor
+            if endpoint:
+                args = {**request.args.to_dict(), 'cursor': page.next_cursor}
+                response.headers['Link'] = f'<{url_for(endpoint, **args)}>; rel="next"'
+
+        return response
+
+    @bp.route('/opportunities', methods=['GET'])
+    @conditional_get
+    @cached_response
+    def get_opportunities():
+        """Return PhD opportunities, optionally filtered by search query
+
+        Supports ?limit=&cursor= pagination and ?fields= projection.
+        """
+        return page_response(request.args, endpoint='opportunities.get_opportunities')
+
+    @bp.route('/opportunities/closing-soon', methods=['GET'])
+    @conditional_get
+    @cached_response
+    def get_closing_soon():
+        """Return PhD opportunities whose deadline is within ?days= (default 30), soonest first
+
+        Accepts the same filters, pagination and projection as /opportunities.
+        """
+        return page_response(request.args, endpoint='opportunities.get_closing_soon', run=engine.closing_soon)
+
+    @bp.route('/opportunity/<int:opportunity_id>', methods=['GET'])
+    @conditional_get
+    @cached_response
+    def get_opportunity(opportunity_id):
+        """Return a specific PhD opportunity by ID"""
+        opportunity = engine.get(opportunity_id)
+
+        if opportunity:
+            return jsonify(opportunity)
+
+        return jsonify({"error": "Opportunity not found"}), 404
+
+    @bp.route('/opportunities/batch', methods=['GET'])
+    @conditional_get
+    def get_opportunities_batch():
+        """Return several PhD opportunities by ID (?ids=1,2,3), in the requested order"""
+        try:
+            ids = parse_ids(request.args.get('ids', ''), limit=BATCH_LOOKUP_LIMIT)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify(engine.get_many(ids))
+
+    @bp.route('/search', methods=['POST'])
+    @cached_response
+    def search_opportunities():
+        """Advanced search for PhD opportunities with multiple criteria
+
+        ?mode=semantic (or "mode" in the body) ranks the query by meaning;
+        "facets": 1 adds per-value counts for university, department, funding and tags.
+        """
+        return page_response(request_params())
+
+    @bp.route('/suggest', methods=['GET'])
+    @conditional_get
+    @cached_response
+    def suggest():
+        """Complete a search-box prefix (?prefix=) from titles, universities, departments and tags"""
+        try:
+            return jsonify(engine.suggest(request.args))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    @bp.route('/match', methods=['POST'])
+    def match_opportunities():
+        """Rank opportunities against a parsed resume
+
+        Send {"resume": <output of /api/resume/parse>} or {"text": "..."},
+        with optional "limit" and "fields".
+        """
+        params = request.get_json(silent=True)
+        if not isinstance(params, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+
+        try:
+            return jsonify(engine.match(params))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except MatcherNotReady as e:
+            return jsonify({"error": str(e)}), 503, {"Retry-After": MATCH_RETRY_AFTER}
+
+    return bp
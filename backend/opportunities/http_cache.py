@@ -0,0 +1,100 @@
+"""HTTP caching helpers shared by the opportunity endpoints
+
+Responses are versioned by the opportunity dataset: the ETag combines the
+store version with the request path and query, so a conditional GET can be
+answered with 304 before any search or serialization runs. Bodies are
+compressed with brotli (when installed) or gzip according to Accept-Encoding.
+"""
+import gzip
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Shared caches (the Vercel edge) may keep listings for a few minutes and
+# serve stale copies while revalidating; browsers always revalidate.
+CACHE_CONTROL = 'public, max-age=0, s-maxage=300, stale-while-revalidate=600'
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+def make_etag(version, request_key):
+    """Weak ETag for a dataset version (a number or a tuple of numbers) and a request (path + query)"""
+    if isinstance(version, tuple):
+        version = '.'.join(str(part) for part in version)
+    digest = hashlib.sha1(f"{version}:{request_key}".encode('utf-8')).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def http_date(timestamp):
+    """Format a POSIX timestamp as an HTTP date"""
+    return formatdate(timestamp, usegmt=True)
+
+
+def is_not_modified(if_none_match, if_modified_since, etag, last_modified):
+    """Decide whether a conditional GET can be answered with 304
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        opaque = etag[2:] if etag.startswith('W/') else etag
+        return '*' in candidates or any(
+            (tag[2:] if tag.startswith('W/') else tag) == opaque for tag in candidates
+        )
+
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+
+    return False
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+
+    offered = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+
+    for encoding in ('br', 'gzip'):
+        if encoding == 'br' and brotli is None:
+            continue
+        if offered.get(encoding, offered.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    """Compress body with the given content coding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def cache_headers(etag, last_modified):
+    """Validator and Cache-Control headers for a cacheable response"""
+    return {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': CACHE_CONTROL,
+        'Vary': 'Accept-Encoding',
+    }
@@ -0,0 +1,47 @@
+"""The opportunity data model
+
+Every record, whatever its source, is normalized to one flat dict with the
+fields below so that indexing, search and serialization see a single shape.
+"""
+
+# Field name -> default value for records that do not provide it
+FIELDS = {
+    'id': None,
+    'title': '',
+    'university': '',
+    'department': '',
+    'location': '',
+    'description': '',
+    'requirements': [],
+    'deadline': '',
+    'posted_date': '',
+    'funding': '',
+    'stipend': '',
+    'contact': '',
+    'advisor': '',
+    'tags': [],
+}
+
+# Older field names still accepted on input
+ALIASES = {
+    'email': 'contact',
+}
+
+
+def normalize_opportunity(record):
+    """Return a record with every model field, renamed aliases and list-valued requirements/tags"""
+    record = {ALIASES.get(name, name): value for name, value in record.items()}
+
+    if record.get('id') is None:
+        raise ValueError("Opportunity records need an id")
+
+    normalized = {}
+    for name, default in FIELDS.items():
+        value = record.get(name)
+        if value is None:
+            value = list(default) if isinstance(default, list) else default
+        elif isinstance(default, list) and isinstance(value, str):
+            value = [value] if value.strip() else []
+        normalized[name] = value
+
+    return normalized
@@ -0,0 +1,59 @@
+"""Cursor pagination and field projection for opportunity listings
+
+Cursors are opaque, URL-safe encodings of the sort key of the last record on
+a page. The next page starts right after that key, so pages stay stable
+while records are added or removed elsewhere in the list.
+"""
+import base64
+import json
+from bisect import bisect_right
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(key):
+    """Encode a sort key as an opaque cursor string"""
+    raw = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor string back into a sort key"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return tuple(key) if isinstance(key, list) else key
+
+
+def parse_limit(value):
+    """Parse a page size, applying the default and the maximum"""
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def paginate(keys, ids, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Slice one page out of ids, which are sorted ascending by keys
+
+    Returns (page_ids, next_cursor); next_cursor is None on the last page.
+    """
+    start = 0
+    if cursor:
+        key = decode_cursor(cursor)
+        try:
+            start = bisect_right(keys, key)
+        except TypeError:
+            raise ValueError("Invalid cursor")
+
+    end = start + limit
+    next_cursor = encode_cursor(keys[end - 1]) if end < len(ids) else None
+    return ids[start:end], next_cursor
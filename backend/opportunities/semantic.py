@@ -0,0 +1,210 @@
+"""Memory-mapped opportunity embeddings with an IVF nearest-neighbour index
+
+The index is built offline from the opportunity records:
+
+    python build_semantic_index.py semantic_index/ [--scraper-state scraper_state.sqlite]
+
+and loaded at startup (SEMANTIC_INDEX_DIR). Embeddings live in
+embeddings.npy, opened with mmap_mode='r', so every worker process on a
+machine shares the same page-cache copy instead of holding its own.
+
+Embeddings are spaCy document vectors (the average of the static word
+vectors of a model such as en_core_web_lg), so a query finds postings that
+use related words, not only the same ones. The model is recorded when the
+index is built and must be installed wherever the index is queried. Vectors
+are L2-normalized so dot products are cosine similarities. The IVF index
+clusters them with spherical k-means and stores the rows grouped by cluster:
+a query scores the centroids, then only the rows of the nprobe closest
+clusters, each a contiguous slice of the file.
+"""
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+from .matching import _normalize_rows, opportunity_text, top_k
+
+INDEX_FORMAT = 2
+DEFAULT_MODEL = 'en_core_web_lg'
+
+
+def model_name(nlp):
+    """Package name of a loaded spaCy pipeline (e.g. en_core_web_lg)"""
+    return f"{nlp.meta.get('lang')}_{nlp.meta.get('name')}"
+
+
+def model_loader(name):
+    """get_nlp function loading the spaCy model name once, on first use"""
+    loaded = []
+    lock = threading.Lock()
+
+    def get_nlp():
+        if not loaded:
+            with lock:
+                if not loaded:
+                    import spacy
+                    loaded.append(spacy.load(name))
+        return loaded[0]
+    return get_nlp
+
+
+class SpacyEmbedder:
+    """Unit-length spaCy document vectors from a model with static word vectors
+
+    The pipeline may be the resume parser's, so texts are only tokenized
+    (nlp.make_doc): its components never run here and are never disabled,
+    which would break parses running at the same time.
+    """
+
+    def __init__(self, get_nlp):
+        self.get_nlp = get_nlp
+
+    def check(self):
+        """Return (model name, dimensions); raises ValueError if the model has no word vectors"""
+        nlp = self.get_nlp()
+        if not len(nlp.vocab.vectors) or not nlp.vocab.vectors_length:
+            raise ValueError(f"spaCy model {model_name(nlp)} has no word vectors; use e.g. {DEFAULT_MODEL}")
+        return model_name(nlp), nlp.vocab.vectors_length
+
+    def embed(self, text):
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts):
+        nlp = self.get_nlp()
+        matrix = np.array([nlp.make_doc(text).vector for text in texts], dtype=np.float32)
+        return _normalize_rows(matrix.reshape(len(texts), nlp.vocab.vectors_length))
+
+
+def spherical_kmeans(vectors, clusters, iterations=10, sample_size=50000, seed=0):
+    """Cluster unit vectors by cosine similarity; returns unit centroids"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+    centroids = np.array(vectors[rng.choice(len(vectors), clusters, replace=False)])
+
+    for _ in range(iterations):
+        assignment = assign_clusters(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        norms = np.linalg.norm(sums, axis=1)
+        # Empty clusters keep their previous centroid
+        filled = norms > 0
+        centroids[filled] = sums[filled] / norms[filled, np.newaxis]
+
+    return centroids
+
+
+def assign_clusters(vectors, centroids, chunk_size=8192):
+    """Index of the most similar centroid for every vector, computed in chunks"""
+    assignment = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_size):
+        chunk = np.asarray(vectors[start:start + chunk_size])
+        assignment[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignment
+
+
+def build_semantic_index(records, directory, model=DEFAULT_MODEL, clusters=None, iterations=10, get_nlp=None):
+    """Embed records with a spaCy model, cluster them and write the index files to directory
+
+    get_nlp returns an already loaded pipeline to use instead of loading model.
+    """
+    records = list(records)
+    texts = [opportunity_text(record) for record in records]
+    embedder = SpacyEmbedder(get_nlp or model_loader(model))
+    model, dimensions = embedder.check()
+    embeddings = embedder.embed_many(texts)
+    ids = np.array([record['id'] for record in records], dtype=np.int64)
+
+    # About sqrt(n) lists keeps both the centroid scan and each list short
+    clusters = min(clusters or max(1, int(math.sqrt(len(records)))), max(1, len(records)))
+    if len(records):
+        centroids = spherical_kmeans(embeddings, clusters, iterations)
+        assignment = assign_clusters(embeddings, centroids)
+    else:
+        centroids = np.zeros((0, dimensions), dtype=np.float32)
+        assignment = np.zeros(0, dtype=np.int32)
+
+    # Group rows by cluster so each inverted list is one contiguous slice
+    order = np.argsort(assignment, kind='stable')
+    offsets = np.searchsorted(assignment[order], np.arange(len(centroids) + 1)).astype(np.int64)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, 'embeddings.npy'), embeddings[order])
+    np.save(os.path.join(directory, 'ids.npy'), ids[order])
+    np.save(os.path.join(directory, 'centroids.npy'), centroids.astype(np.float32))
+    np.save(os.path.join(directory, 'offsets.npy'), offsets)
+    with open(os.path.join(directory, 'meta.json'), 'w') as file:
+        json.dump({'format': INDEX_FORMAT, 'count': len(records), 'model': model, 'dimensions': dimensions}, file)
+
+    return SemanticIndex(directory, get_nlp=embedder.get_nlp)
+
+
+class SemanticIndex:
+    """Read-only IVF index over memory-mapped embeddings
+
+    Queries are embedded with the model the index was built with; get_nlp
+    may supply that model already loaded (e.g. the resume parser's), and is
+    only used if it is the same model.
+    """
+
+    def __init__(self, directory, nprobe=8, get_nlp=None):
+        with open(os.path.join(directory, 'meta.json')) as file:
+            meta = json.load(file)
+        if meta.get('format') != INDEX_FORMAT:
+            raise ValueError(f"Unsupported semantic index format in {directory}; rebuild it")
+
+        self.directory = directory
+        self.model = meta['model']
+        self._get_nlp = get_nlp
+        self._embedder = None
+        self.embeddings = np.load(os.path.join(directory, 'embeddings.npy'), mmap_mode='r')
+        self.ids = np.load(os.path.join(directory, 'ids.npy'), mmap_mode='r')
+        # Centroids and list offsets are small; keep them in memory
+        self.centroids = np.load(os.path.join(directory, 'centroids.npy'))
+        self.offsets = np.load(os.path.join(directory, 'offsets.npy'))
+        self.nprobe = self.clamp_nprobe(nprobe)
+
+    def clamp_nprobe(self, nprobe):
+        """Scan at least one cluster and at most all of them"""
+        return max(1, min(int(nprobe), len(self.centroids)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            get_nlp = self._get_nlp
+            if get_nlp is None or model_name(get_nlp()) != self.model:
+                get_nlp = model_loader(self.model)
+            self._embedder = SpacyEmbedder(get_nlp)
+        return self._embedder
+
+    def search(self, text, k=100, nprobe=None):
+        """Return [(id, score)] of up to k nearest opportunities, best first"""
+        if not len(self.centroids):
+            return []
+        query = self.embedder.embed(text)
+        if not query.any():
+            return []
+
+        nprobe = self.nprobe if nprobe is None else self.clamp_nprobe(nprobe)
+        lists = top_k(self.centroids @ query, nprobe)
+
+        rows = [np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists]
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        # Contiguous slices read straight from the mapped file
+        vectors = np.concatenate([self.embeddings[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+        scores = vectors @ query
+
+        best = top_k(scores, k)
+        return [(int(self.ids[rows[i]]), float(scores[i])) for i in best if scores[i] > 0]
+
+
+def load_semantic_index(directory, nprobe=8, get_nlp=None):
+    """Load the index in directory, or return None when none has been built"""
+    if not directory or not os.path.exists(os.path.join(directory, 'meta.json')):
+        return None
+    return SemanticIndex(directory, nprobe, get_nlp)
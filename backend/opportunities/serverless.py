@@ -0,0 +1,141 @@
+"""Adapter for BaseHTTPRequestHandler-style serverless functions
+
+Responses use the {"message", "data"} envelope; list responses also carry
+"total" and "next_cursor", and "facets" when facet counts were requested. Handlers call handle_get/handle_post and write
+the returned (status, headers, body) triple.
+"""
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from .engine import BATCH_LOOKUP_LIMIT
+from .http_cache import MIN_COMPRESS_SIZE, cache_headers, choose_encoding, is_not_modified, make_etag
+from .matching import MATCH_RETRY_AFTER, MatcherNotReady
+from .response_cache import CachedResponse, normalize_params
+from .serializer import dumps, envelope
+from .store import parse_ids
+
+ENDPOINTS = [
+    "/api/opportunities",
+    "/api/opportunities/batch?ids={id},{id}",
+    "/api/opportunities/closing-soon?days={days}",
+    "/api/opportunity/{id}",
+    "/api/search",
+    "/api/suggest?prefix={text}",
+    "/api/match"
+]
+
+
+class ServerlessAPI:
+    """Route GET/POST requests to a QueryEngine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def handle_get(self, path, headers):
+        """Answer a GET request; returns (status, headers, body)"""
+        engine = self.engine
+
+        # Every GET response is derived from the opportunity data, so its
+        # version validates it; a conditional GET needs no further work
+        etag = make_etag(engine.version, path)
+        response_headers = cache_headers(etag, engine.modified_at)
+
+        if is_not_modified(headers.get('If-None-Match'), headers.get('If-Modified-Since'),
+                           etag, engine.modified_at):
+            return 304, response_headers, b''
+
+        url = urlsplit(path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        key = normalize_params(url.path, params)
+        entry = engine.cached(key, lambda: CachedResponse(dumps(self.get_response_data(url.path, params))))
+
+        return self.encode(entry, headers, response_headers)
+
+    def handle_post(self, path, headers, body):
+        """Answer a POST request; returns (status, headers, body)"""
+        url = urlsplit(path)
+
+        if url.path not in ('/api/search', '/api/match'):
+            return self.encode(CachedResponse(dumps(envelope(None, "Endpoint not found"))), headers, status=404)
+
+        try:
+            params = json.loads(body.decode() or '{}')
+            if not isinstance(params, dict):
+                raise ValueError("Search parameters must be a JSON object")
+            params = {**{name: values[0] for name, values in parse_qs(url.query).items()}, **params}
+        except ValueError:
+            return self.encode(CachedResponse(dumps(envelope([], "Error processing search request"))), headers)
+
+        if url.path == '/api/match':
+            try:
+                data = envelope(self.engine.match(params))
+            except ValueError as e:
+                data = envelope([], str(e))
+            except MatcherNotReady as e:
+                return self.encode(CachedResponse(dumps(envelope([], str(e)))), headers,
+                                   {'Retry-After': MATCH_RETRY_AFTER}, status=503)
+            return self.encode(CachedResponse(dumps(data)), headers)
+
+        key = normalize_params(url.path, params)
+        entry = self.engine.cached(key, lambda: CachedResponse(dumps(self.page_envelope(params))))
+        return self.encode(entry, headers)
+
+    def get_response_data(self, path, params):
+        """Build the response for a GET request"""
+        if path == '/api/opportunities':
+            return self.page_envelope(params)
+
+        if path == '/api/opportunities/closing-soon':
+            return self.page_envelope(params, self.engine.closing_soon)
+
+        if path == '/api/suggest':
+            try:
+                return envelope(self.engine.suggest(params))
+            except ValueError as e:
+                return envelope([], str(e))
+
+        if path == '/api/opportunities/batch':
+            try:
+                ids = parse_ids(params.get('ids', ''), limit=BATCH_LOOKUP_LIMIT)
+            except ValueError as e:
+                return envelope([], str(e))
+            return envelope(self.engine.get_many(ids))
+
+        if path.startswith('/api/opportunity/'):
+            try:
+                opportunity_id = int(path.split('/')[-1])
+            except ValueError:
+                return envelope(None, "Invalid opportunity ID")
+            opportunity = self.engine.get(opportunity_id)
+            if opportunity:
+                return envelope(opportunity)
+            return envelope(None, "Opportunity not found")
+
+        return {
+            "message": "Welcome to the PhD Opportunity Finder API",
+            "endpoints": ENDPOINTS
+        }
+
+    def page_envelope(self, params, run=None):
+        """Run a query (engine.search by default) and wrap one page of results"""
+        try:
+            page = (run or self.engine.search)(params)
+        except ValueError as e:
+            return envelope([], str(e))
+        if page.facets is None:
+            return envelope(page.items, total=page.total, next_cursor=page.next_cursor)
+        return envelope(page.items, total=page.total, next_cursor=page.next_cursor, facets=page.facets)
+
+    def encode(self, entry, request_headers, response_headers=None, status=200):
+        """Pick the content coding for a serialized response"""
+        response_headers = dict(response_headers or {})
+        response_headers['Content-Type'] = 'application/json'
+        response_headers['Vary'] = 'Accept-Encoding'
+
+        encoding = choose_encoding(request_headers.get('Accept-Encoding'))
+        if len(entry.body) < MIN_COMPRESS_SIZE:
+            encoding = None
+        if encoding:
+            response_headers['Content-Encoding'] = encoding
+
+        return status, response_headers, entry.encoded(encoding)
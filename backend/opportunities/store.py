@@ -0,0 +1,118 @@
+"""Id-keyed storage for PhD opportunity records
+
+The store is the single owner of the records. Indexes attach to it and are
+updated on every upsert/delete, and the version counter lets caches notice
+when the data has changed.
+"""
+import time
+
+
+class OpportunityStore:
+    """In-memory opportunity records keyed by id, in insertion order"""
+
+    def __init__(self, records=()):
+        self._records = {}
+        self._listeners = []
+        # id -> insertion position, the stable sort key for listings
+        self.positions = {}
+        self._next_position = 0
+        self._ordered = None
+        self.version = 0
+        self.modified_at = time.time()
+        self.upsert_many(records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, opportunity_id):
+        return opportunity_id in self._records
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def attach(self, listener):
+        """Keep listener (anything with add_many/add/remove, e.g. an index) in sync"""
+        listener.add_many(self._records.values())
+        self._listeners.append(listener)
+        return listener
+
+    def get(self, opportunity_id):
+        """Return one record, or None"""
+        return self._records.get(opportunity_id)
+
+    def get_many(self, opportunity_ids):
+        """Return the records for ids in the requested order, skipping unknown ids"""
+        records = self._records
+        return [records[opportunity_id] for opportunity_id in opportunity_ids if opportunity_id in records]
+
+    def all(self):
+        """Return every record in insertion order"""
+        return list(self._records.values())
+
+    def ordered(self):
+        """Return (positions, ids) in insertion order, cached until the next change"""
+        if self._ordered is None:
+            ids = list(self._records)
+            self._ordered = ([self.positions[opportunity_id] for opportunity_id in ids], ids)
+        return self._ordered
+
+    def _touch(self):
+        """Record that the data changed"""
+        self.version += 1
+        self.modified_at = time.time()
+
+    def _store(self, record):
+        """Insert or replace a record without notifying listeners"""
+        opportunity_id = record['id']
+        if opportunity_id not in self.positions:
+            self.positions[opportunity_id] = self._next_position
+            self._next_position += 1
+        self._records[opportunity_id] = record
+        self._ordered = None
+
+    def upsert(self, record):
+        """Insert or replace a record"""
+        self._store(record)
+        self._touch()
+        for listener in self._listeners:
+            listener.add(record)
+
+    def upsert_many(self, records):
+        """Insert or replace several records"""
+        records = list(records)
+        if not records:
+            return
+        for record in records:
+            self._store(record)
+        self._touch()
+        for listener in self._listeners:
+            listener.add_many(records)
+
+    def delete(self, opportunity_id):
+        """Remove a record; returns False if it did not exist"""
+        if self._records.pop(opportunity_id, None) is None:
+            return False
+        del self.positions[opportunity_id]
+        self._ordered = None
+        self._touch()
+        for listener in self._listeners:
+            listener.remove(opportunity_id)
+        return True
+
+
+def parse_ids(value, limit=None):
+    """Parse a comma-separated id list ("1,2,3") into ints
+
+    Raises ValueError for non-numeric ids or when more than limit are given.
+    """
+    ids = []
+    for part in value.split(','):
+        if not part.strip():
+            continue
+        try:
+            ids.append(int(part))
+        except ValueError:
+            raise ValueError(f"Invalid opportunity ID: {part.strip()}")
+    if limit is not None and len(ids) > limit:
+        raise ValueError(f"At most {limit} ids can be requested at once")
+    return ids
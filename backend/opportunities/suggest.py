@@ -0,0 +1,263 @@
+"""Search-box suggestions over opportunity titles, universities, departments and tags
+
+Every distinct (field, phrase) becomes a suggestion weighted by the number of
+records carrying it. Each suggestion is reachable from the start of any of
+its words: the normalized phrase from each word onwards is a key in one
+sorted array, so a prefix lookup is two bisects. Ranking a short prefix that
+matches many keys is memoized per build. When a prefix matches too little,
+its last word is corrected against the vocabulary with a bounded edit
+distance walk over the sorted word list.
+
+The structure is rebuilt lazily when the data version changes.
+"""
+import heapq
+import threading
+from bisect import bisect_left
+
+from .index import tokenize
+
+SUGGEST_FIELDS = ('title', 'university', 'department', 'tags')
+
+DEFAULT_SUGGEST_LIMIT = 8
+MAX_SUGGEST_LIMIT = 20
+
+# Keys are cut to this length; longer prefixes are compared on it too
+MAX_KEY_LENGTH = 48
+
+# Words no suggestion is looked up from
+STOP_WORDS = {'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'the', 'to', 'with'}
+
+# Prefix lookups matching more keys than this have their ranking memoized
+MEMO_THRESHOLD = 1000
+
+# Corrections memoized per build before the memo is cleared
+MAX_CORRECTIONS = 4096
+
+# Typo tolerance by length of the last word: (minimum length, edits allowed)
+TYPO_DISTANCES = ((8, 2), (4, 1))
+
+
+def normalize_prefix(text):
+    """Lower-case words joined by single spaces, cut to MAX_KEY_LENGTH"""
+    return ' '.join(tokenize(text))[:MAX_KEY_LENGTH]
+
+
+def parse_suggest_limit(value):
+    """Validate the number of suggestions to return"""
+    if value in (None, ''):
+        return DEFAULT_SUGGEST_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, MAX_SUGGEST_LIMIT)
+
+
+def typo_distance(word):
+    """Edits tolerated in a word of this length"""
+    for length, distance in TYPO_DISTANCES:
+        if len(word) >= length:
+            return distance
+    return 0
+
+
+def fuzzy_prefixes(vocabulary, word, max_distance):
+    """{prefix: distance} of vocabulary prefixes within max_distance edits of word
+
+    Only terms sharing the first letter of word are considered; typos there
+    are rare and the anchor keeps the walk to one slice of the vocabulary.
+    The slice is walked like a trie, reusing the edit distance rows of the
+    prefix shared with the previous term and skipping every term under a
+    prefix that is already too far away.
+    """
+    found = {}
+    if not word:
+        return found
+    # Cells further than max_distance from the diagonal cannot be within
+    # max_distance, so only that band is computed; the rest hold `beyond`
+    beyond = max_distance + 1
+    rows = [[min(j, beyond) for j in range(len(word) + 1)]]
+    previous = ''
+    deepest = len(word) + max_distance
+    i = bisect_left(vocabulary, word[0])
+    end = bisect_left(vocabulary, word[0] + '\uffff', i)
+    while i < end:
+        term = vocabulary[i]
+        shared = 0
+        limit = min(len(previous), len(term), len(rows) - 1)
+        while shared < limit and previous[shared] == term[shared]:
+            shared += 1
+        del rows[shared + 1:]
+
+        skip = None
+        for depth in range(shared, min(len(term), deepest)):
+            char, above, length = term[depth], rows[-1], depth + 1
+            row = [beyond] * (len(word) + 1)
+            row[0] = min(length, beyond)
+            best = row[0]
+            for j in range(max(1, length - max_distance), min(len(word), length + max_distance) + 1):
+                cell = min(row[j - 1] + 1, above[j] + 1, above[j - 1] + (word[j - 1] != char), beyond)
+                row[j] = cell
+                if cell < best:
+                    best = cell
+            rows.append(row)
+
+            distance = row[-1]
+            if distance <= max_distance and length >= len(word) - max_distance:
+                prefix = term[:length]
+                found[prefix] = min(found.get(prefix, distance), distance)
+            if best > max_distance:
+                skip = term[:length]
+                break
+
+        if skip is None and len(term) >= deepest:
+            skip = term[:deepest]
+        if skip is not None:
+            previous = skip
+            i = bisect_left(vocabulary, skip + '\uffff', i + 1)
+        else:
+            previous = term
+            i += 1
+    return found
+
+
+class SuggestionIndex:
+    """Sorted suggestion keys built from one snapshot of the store"""
+
+    def __init__(self, records, fields=SUGGEST_FIELDS):
+        entries = {}
+        for record in records:
+            for field in fields:
+                value = record.get(field)
+                seen = set()
+                for phrase in value if isinstance(value, (list, tuple)) else [value]:
+                    if not phrase:
+                        continue
+                    key = (field, ' '.join(tokenize(phrase)))
+                    if not key[1] or key in seen:
+                        continue
+                    seen.add(key)
+                    entry = entries.get(key)
+                    if entry is None:
+                        entries[key] = [str(phrase).strip(), 1]
+                    else:
+                        entry[1] += 1
+
+        self.texts, self.fields, self.counts = [], [], []
+        keys = []
+        vocabulary = set()
+        for number, ((field, normalized), (text, count)) in enumerate(entries.items()):
+            self.texts.append(text)
+            self.fields.append(field)
+            self.counts.append(count)
+            words = normalized.split(' ')
+            vocabulary.update(words)
+            start = 0
+            for word in words:
+                if word not in STOP_WORDS or start == 0:
+                    keys.append((normalized[start:start + MAX_KEY_LENGTH], number))
+                start += len(word) + 1
+
+        keys.sort()
+        self.keys = [key for key, _ in keys]
+        self.entries = [number for _, number in keys]
+        self.vocabulary = sorted(vocabulary)
+        self._memo = {}
+        self._corrections = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _rank(self, entry):
+        return -self.counts[entry], len(self.texts[entry]), self.texts[entry]
+
+    def lookup(self, prefix, limit):
+        """Best entries with a word starting with prefix, most popular first"""
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + '\uffff', start)
+        if end - start <= MEMO_THRESHOLD:
+            return heapq.nsmallest(limit, set(self.entries[start:end]), key=self._rank)
+
+        memo = self._memo.get(prefix)
+        if memo is None or len(memo) < limit:
+            # Short prefixes: rank once, up to the largest limit anyone may ask for
+            memo = self._memo[prefix] = heapq.nsmallest(
+                MAX_SUGGEST_LIMIT, set(self.entries[start:end]), key=self._rank)
+        return memo[:limit]
+
+    def corrections(self, word):
+        """{vocabulary prefix: distance} of the closest corrections of word
+
+        One edit is tried first; two only when nothing is one edit away.
+        """
+        corrections = self._corrections.get(word)
+        if corrections is None:
+            corrections = {}
+            for max_distance in range(1, typo_distance(word) + 1):
+                corrections = {
+                    prefix: distance
+                    for prefix, distance in fuzzy_prefixes(self.vocabulary, word, max_distance).items()
+                    if distance
+                }
+                if corrections:
+                    break
+            if len(self._corrections) >= MAX_CORRECTIONS:
+                self._corrections.clear()
+            self._corrections[word] = corrections
+        return corrections
+
+    def suggest(self, text, limit=DEFAULT_SUGGEST_LIMIT, fuzzy=True):
+        """Return [{"text", "field", "count"}] completing text, best first"""
+        prefix = normalize_prefix(text)
+        if not prefix:
+            return []
+
+        found = list(self.lookup(prefix, limit))
+        if fuzzy and len(found) < limit:
+            head, _, word = prefix.rpartition(' ')
+            if typo_distance(word):
+                seen = set(found)
+                corrected = []
+                for correction, distance in sorted(self.corrections(word).items(), key=lambda item: item[1]):
+                    candidate = f'{head} {correction}' if head else correction
+                    for entry in self.lookup(candidate[:MAX_KEY_LENGTH], limit):
+                        if entry not in seen:
+                            seen.add(entry)
+                            corrected.append((distance, self._rank(entry), entry))
+                found += [entry for _, _, entry in sorted(corrected)[:limit - len(found)]]
+
+        return [
+            {"text": self.texts[entry], "field": self.fields[entry], "count": self.counts[entry]}
+            for entry in found
+        ]
+
+
+class Suggester:
+    """SuggestionIndex over a store, rebuilt when the store changes
+
+    version and records default to the store's version and every record;
+    pass others to suggest from a subset (e.g. only unexpired records).
+    """
+
+    def __init__(self, store, fields=SUGGEST_FIELDS, version=None, records=None):
+        self.version = version or (lambda: store.version)
+        self.records = records or store.all
+        self.fields = fields
+        self._built = (None, None)
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Return the SuggestionIndex for the current version"""
+        built = self._built
+        if built[0] != self.version():
+            with self._lock:
+                built = self._built
+                version = self.version()
+                if built[0] != version:
+                    built = self._built = (version, SuggestionIndex(self.records(), self.fields))
+        return built[1]
+
+    def suggest(self, text, limit=DEFAULT_SUGGEST_LIMIT, fuzzy=True):
+        return self.refresh().suggest(text, limit, fuzzy)
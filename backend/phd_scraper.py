@@ -0,0 +1,397 @@
+"""Scraper that ingests PhD postings into the opportunity store
+
+Pages are expected to describe themselves with schema.org JSON-LD: listing
+pages carry an ItemList whose items link to posting pages, and posting pages
+carry a JobPosting. The crawler:
+
+- fetches with aiohttp over a pooled connector, limiting concurrent
+  connections per host
+- sends If-None-Match / If-Modified-Since from the previous crawl
+- parses and upserts postings in small batches as pages arrive
+- skips postings whose content hash has not changed, so only changed
+  records are re-indexed
+
+Crawl state (validators, content hashes and the last parsed records) is kept
+in SQLite so a later crawl, or the API at startup, can pick it up.
+
+Usage:
+    python phd_scraper.py crawl http://localhost:8765/index.html
+    python phd_scraper.py serve-fixtures   # local stand-in serving fixtures/postings
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from html import unescape
+from html.parser import HTMLParser
+from urllib.parse import urldefrag, urljoin
+
+from opportunities import normalize_opportunity
+from opportunities.serializer import dumps
+
+DEFAULT_STATE_DB = os.getenv('SCRAPER_STATE_DB', 'scraper_state.sqlite')
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'postings')
+
+# Records are upserted in batches of this size while the crawl is running
+UPSERT_BATCH_SIZE = 50
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+class _JSONLDExtractor(HTMLParser):
+    """Collect the contents of <script type="application/ld+json"> blocks"""
+
+    def __init__(self):
+        super().__init__()
+        self.blocks = []
+        self._buffer = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'script' and dict(attrs).get('type', '').lower() == 'application/ld+json':
+            self._buffer = []
+
+    def handle_data(self, data):
+        if self._buffer is not None:
+            self._buffer.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._buffer is not None:
+            self.blocks.append(''.join(self._buffer))
+            self._buffer = None
+
+
+def extract_json_ld(html):
+    """Return every JSON-LD object on a page, flattening lists and @graph"""
+    parser = _JSONLDExtractor()
+    parser.feed(html)
+
+    objects = []
+    for block in parser.blocks:
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        pending = data if isinstance(data, list) else [data]
+        while pending:
+            item = pending.pop(0)
+            if isinstance(item, dict):
+                objects.append(item)
+                pending.extend(item.get('@graph', []))
+    return objects
+
+
+def _text(value):
+    """Plain text from a JSON-LD value that may hold HTML"""
+    if value is None:
+        return ''
+    if isinstance(value, dict):
+        value = value.get('name') or value.get('value') or ''
+    return ' '.join(unescape(TAG_PATTERN.sub(' ', str(value))).split())
+
+
+def _list(value):
+    """A list of strings from a JSON-LD value (list or comma-separated string)"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    return [_text(item) for item in value if _text(item)]
+
+
+def _object(value, key='name'):
+    """A JSON-LD value that may be a string, an object or a list of them, as one object"""
+    if isinstance(value, list):
+        value = next((item for item in value if item), None)
+    if isinstance(value, str):
+        return {key: value}
+    return value if isinstance(value, dict) else {}
+
+
+def posting_id(url, posting):
+    """Numeric id from the posting's identifier, or a stable hash of its URL"""
+    identifier = posting.get('identifier')
+    if isinstance(identifier, dict):
+        identifier = identifier.get('value')
+    if identifier is not None and str(identifier).isdigit():
+        return int(identifier)
+    return int(hashlib.sha1(url.encode('utf-8')).hexdigest()[:12], 16)
+
+
+def parse_posting(url, posting):
+    """Map a schema.org JobPosting to an opportunity record"""
+    organization = _object(posting.get('hiringOrganization'))
+    address = _object(_object(posting.get('jobLocation'), 'address').get('address'), 'addressLocality')
+    contact = _object(posting.get('applicationContact'), 'email')
+
+    return normalize_opportunity({
+        'id': posting_id(url, posting),
+        'title': _text(posting.get('title') or posting.get('name')),
+        'university': _text(organization.get('name')),
+        'department': _text(organization.get('department')),
+        'location': ', '.join(
+            _text(address.get(part)) for part in ('addressLocality', 'addressRegion', 'addressCountry')
+            if address.get(part)
+        ),
+        'description': _text(posting.get('description')),
+        'requirements': _list(posting.get('qualifications')),
+        'deadline': str(posting.get('validThrough') or '')[:10],
+        'posted_date': str(posting.get('datePosted') or '')[:10],
+        'funding': _text(posting.get('incentiveCompensation')),
+        'stipend': _text(posting.get('baseSalary')),
+        'contact': _text(contact.get('email') or contact.get('url')),
+        'advisor': _text(posting.get('advisor')),
+        'tags': _list(posting.get('keywords')),
+    })
+
+
+def parse_page(url, html):
+    """Return (records, links) found on a page"""
+    records = []
+    links = []
+
+    for item in extract_json_ld(html):
+        kind = item.get('@type')
+        kinds = kind if isinstance(kind, list) else [kind]
+        if 'JobPosting' in kinds:
+            records.append(parse_posting(url, item))
+        elif 'ItemList' in kinds:
+            for element in item.get('itemListElement', []):
+                target = element.get('url') or _object(element.get('item'), 'url').get('url') if isinstance(element, dict) else element
+                if target:
+                    links.append(urldefrag(urljoin(url, target))[0])
+
+    return records, links
+
+
+def content_hash(record):
+    """Hash of a record's content, the same whichever JSON library is installed"""
+    canonical = json.dumps(record, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ScraperState:
+    """SQLite record of what each URL returned on the previous crawl"""
+
+    def __init__(self, path=DEFAULT_STATE_DB):
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, links TEXT, fetched_at REAL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "id INTEGER PRIMARY KEY, url TEXT NOT NULL, content_hash TEXT NOT NULL, record TEXT NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS postings_url ON postings (url)")
+        self.db.commit()
+
+    def validators(self, url):
+        """Return (etag, last_modified) stored for url"""
+        row = self.db.execute("SELECT etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        return row or (None, None)
+
+    def links(self, url):
+        """Links found on url when it was last fetched"""
+        row = self.db.execute("SELECT links FROM pages WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else []
+
+    def save_page(self, url, etag, last_modified, links):
+        self.db.execute(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, links, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, json.dumps(links), time.time())
+        )
+
+    def hashes(self):
+        """Return {id: content hash} for every stored posting"""
+        return dict(self.db.execute("SELECT id, content_hash FROM postings"))
+
+    def records_for(self, url):
+        """Records last parsed from url"""
+        return [json.loads(row[0]) for row in self.db.execute("SELECT record FROM postings WHERE url = ?", (url,))]
+
+    def records(self):
+        """Every stored record"""
+        return [json.loads(row[0]) for row in self.db.execute("SELECT record FROM postings ORDER BY id")]
+
+    def save_record(self, url, record, record_hash):
+        self.db.execute(
+            "INSERT OR REPLACE INTO postings (id, url, content_hash, record) VALUES (?, ?, ?, ?)",
+            (record['id'], url, record_hash, dumps(record).decode('utf-8'))
+        )
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+async def crawl(seed_urls, engine=None, state=None, per_host=4, concurrency=32, timeout=30):
+    """Crawl seed_urls and the postings they list, upserting changed records
+
+    Returns counters describing what happened.
+    """
+    import aiohttp
+
+    state = state or ScraperState()
+    known_hashes = state.hashes()
+    stats = {'fetched': 0, 'not_modified': 0, 'unchanged': 0, 'updated': 0, 'failed': 0}
+
+    queue = asyncio.Queue()
+    seen = set()
+    pending = []
+
+    def enqueue(url):
+        if url not in seen:
+            seen.add(url)
+            queue.put_nowait(url)
+
+    def flush():
+        if pending and engine is not None:
+            engine.upsert_many(pending)
+        pending.clear()
+        state.commit()
+
+    def ingest(url, records):
+        for record in records:
+            record_hash = content_hash(record)
+            if known_hashes.get(record['id']) == record_hash:
+                stats['unchanged'] += 1
+                if engine is not None and engine.get(record['id']) is None:
+                    pending.append(record)
+                continue
+            known_hashes[record['id']] = record_hash
+            state.save_record(url, record, record_hash)
+            pending.append(record)
+            stats['updated'] += 1
+        if len(pending) >= UPSERT_BATCH_SIZE:
+            flush()
+
+    async def fetch(session, url):
+        """Return (records, links) for url, from the stored state on 304"""
+        etag, last_modified = state.validators(url)
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304:
+                stats['not_modified'] += 1
+                return state.records_for(url), state.links(url)
+            response.raise_for_status()
+            html = await response.text(errors='replace')
+
+        stats['fetched'] += 1
+        records, links = parse_page(url, html)
+        state.save_page(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), links)
+        return records, links
+
+    async def worker(session):
+        while True:
+            url = await queue.get()
+            try:
+                records, links = await fetch(session, url)
+                ingest(url, records)
+                for link in links:
+                    enqueue(link)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                stats['failed'] += 1
+                print(f"Failed to fetch {url}: {e}", file=sys.stderr)
+            except Exception as e:
+                # A malformed page must not end the worker, or the queue never drains
+                stats['failed'] += 1
+                print(f"Failed to process {url}: {e!r}", file=sys.stderr)
+            finally:
+                queue.task_done()
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        for url in seed_urls:
+            enqueue(url)
+        workers = [asyncio.create_task(worker(session)) for _ in range(concurrency)]
+        await queue.join()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    flush()
+    return stats
+
+
+def load_scraped_opportunities(path=DEFAULT_STATE_DB):
+    """Records saved by previous crawls, for loading into a QueryEngine"""
+    state = ScraperState(path)
+    try:
+        return state.records()
+    finally:
+        state.close()
+
+
+def serve_fixtures(directory=FIXTURES_DIR, host='127.0.0.1', port=8765):
+    """Serve fixture pages over HTTP with ETag/Last-Modified support, for testing"""
+    from functools import partial
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class FixtureHandler(SimpleHTTPRequestHandler):
+        def send_head(self):
+            path = self.translate_path(self.path)
+            if os.path.isfile(path):
+                with open(path, 'rb') as file:
+                    etag = '"' + hashlib.sha1(file.read()).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return None
+                self._etag = etag
+            return super().send_head()
+
+        def end_headers(self):
+            etag = getattr(self, '_etag', None)
+            if etag:
+                self.send_header('ETag', etag)
+                self._etag = None
+            super().end_headers()
+
+    server = ThreadingHTTPServer((host, port), partial(FixtureHandler, directory=directory))
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl PhD postings into the opportunity store")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    crawl_parser = commands.add_parser('crawl', help="crawl listing/posting URLs")
+    crawl_parser.add_argument('urls', nargs='+')
+    crawl_parser.add_argument('--state', default=DEFAULT_STATE_DB, help="SQLite crawl state file")
+    crawl_parser.add_argument('--per-host', type=int, default=4, help="concurrent connections per host")
+    crawl_parser.add_argument('--concurrency', type=int, default=32, help="concurrent fetches overall")
+
+    serve_parser = commands.add_parser('serve-fixtures', help="serve fixture pages locally")
+    serve_parser.add_argument('--directory', default=FIXTURES_DIR)
+    serve_parser.add_argument('--port', type=int, default=8765)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve-fixtures':
+        server = serve_fixtures(args.directory, port=args.port)
+        print(f"Serving {args.directory} on http://127.0.0.1:{args.port}/")
+        server.serve_forever()
+        return
+
+    state = ScraperState(args.state)
+    started = time.perf_counter()
+    stats = asyncio.run(crawl(args.urls, state=state, per_host=args.per_host, concurrency=args.concurrency))
+    state.close()
+    print(json.dumps({**stats, 'seconds': round(time.perf_counter() - started, 2)}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Content-addressed cache for parsed resumes
+
+Results are keyed by the SHA-256 of the uploaded bytes, so the same file is
+only parsed once no matter who uploads it. Lookups go through a small
+in-process LRU first and then an SQLite file shared by every worker. The
+file holds personal data, so it lives in the app's data directory (DATA_DIR)
+and is only readable by the user the app runs as.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# App-owned directory for local databases
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+
+
+def hash_stream(stream, chunk_size=64 * 1024):
+    """Return the SHA-256 hex digest and size of a binary stream, read in chunks"""
+    sha = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        sha.update(chunk)
+        size += len(chunk)
+    return sha.hexdigest(), size
+
+
+def cache_key(digest, file_ext, parser_version):
+    """Build the cache key for an upload's SHA-256 digest parsed as file_ext"""
+    return f"{parser_version}:{file_ext.lower()}:{digest}"
+
+
+def create_private_file(path):
+    """Create path (and its directory) readable only by the current user, if it does not exist"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+    os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+
+
+class ResumeCache:
+    """Two-tier (memory LRU + SQLite) cache of parse results"""
+
+    def __init__(self, max_entries=256, db_path=None, max_disk_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+        self._db = None
+        if db_path:
+            create_private_file(db_path)
+            self._db = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parsed_resumes ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS parsed_resumes_accessed "
+                "ON parsed_resumes (accessed_at)"
+            )
+            self._db.commit()
+            self._disk_bytes = self._stored_bytes()
+
+    def get(self, key):
+        """Return the cached result for key, or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM parsed_resumes WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE parsed_resumes SET accessed_at = ? WHERE key = ?",
+                        (time.time(), key)
+                    )
+                    self._db.commit()
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    self.counters["disk_hits"] += 1
+                    return result
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key, result):
+        """Store a parse result in both tiers"""
+        with self._lock:
+            self._remember(key, result)
+
+            if self._db is not None:
+                value = json.dumps(result)
+                size = len(value.encode('utf-8'))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO parsed_resumes (key, value, size, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, size, time.time())
+                )
+                # Other workers write to the same file; count what is there
+                # now, inside this write transaction, before evicting
+                self._disk_bytes = self._stored_bytes()
+                self._evict_disk()
+                self._db.commit()
+
+    def stats(self):
+        """Return hit/miss counters and current sizes"""
+        with self._lock:
+            lookups = sum(self.counters.values()) - self.counters["evictions"]
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            return {
+                **self.counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._stored_bytes() if self._db is not None else 0,
+            }
+
+    def _stored_bytes(self):
+        """Total size of the rows in the disk tier, whichever worker wrote them"""
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM parsed_resumes").fetchone()[0]
+
+    def _remember(self, key, result):
+        """Insert into the memory tier, evicting the least recently used entry"""
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Drop least recently used rows until the disk tier fits its budget"""
+        while self._disk_bytes > self.max_disk_bytes:
+            row = self._db.execute(
+                "SELECT key, size FROM parsed_resumes ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._disk_bytes = 0
+                break
+            self._db.execute("DELETE FROM parsed_resumes WHERE key = ?", (row[0],))
+            self._disk_bytes -= row[1]
+            self.counters["evictions"] += 1
+
+
+def cache_from_env():
+    """Create the cache configured through RESUME_CACHE_* environment variables"""
+    db_path = os.getenv('RESUME_CACHE_DB', os.path.join(DATA_DIR, 'resume_cache.sqlite'))
+    return ResumeCache(
+        max_entries=int(os.getenv('RESUME_CACHE_SIZE', '256')),
+        db_path=db_path or None,
+        max_disk_bytes=int(os.getenv('RESUME_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+    )
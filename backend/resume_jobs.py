@@ -0,0 +1,220 @@
+"""In-process job queue for background resume parsing
+
+Jobs run on a dedicated process pool whose workers are initialized once
+(loading the spaCy model) and then reused, so a slow parse never holds a
+Flask worker. The number of unfinished jobs is bounded: submit raises
+QueueFull once max_pending jobs are waiting or running, which the API turns
+into a 429. Finished jobs are kept for ttl seconds so clients can poll for
+their results. If a worker process dies (out of memory, a crash in a PDF
+library), the jobs on that pool fail and the next submit starts a new pool.
+
+Job state lives in this process; with several server processes, poll the
+same process that accepted the job (or run a single API process).
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds its maximum number of unfinished jobs"""
+
+
+class Job:
+    """One submitted job and its timing"""
+
+    def __init__(self, job_id, meta=None, key=None, args=()):
+        self.id = job_id
+        self.meta = dict(meta or {})
+        self.key = key
+        self.args = args
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.timings = {}
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.future = None
+
+    def to_dict(self):
+        status = self.status
+        if status == 'queued' and self.future is not None and self.future.running():
+            status = 'running'
+
+        data = {
+            "job_id": self.id,
+            "status": status,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+            **self.meta
+        }
+        if self.finished_at is not None:
+            data["timings"] = {
+                **self.timings,
+                "total_seconds": round(self.finished_at - self.submitted_at, 4)
+            }
+        if status == 'done':
+            data["result"] = self.result
+        elif status == 'failed':
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """Bounded queue running func(*args) -> (result, timings) on worker processes"""
+
+    def __init__(self, func, workers=2, max_pending=32, ttl=3600, initializer=None, on_done=None,
+                 on_failed=None):
+        self.func = func
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.initializer = initializer
+        self.on_done = on_done
+        self.on_failed = on_failed
+        self.jobs = OrderedDict()
+        self.pending = 0
+        self.counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0}
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        # Started on first use so importing the app does not fork workers
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer)
+        return self._pool
+
+    def _discard_pool(self, pool):
+        """Stop using a broken pool; the next submit starts a new one"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, *args, meta=None, key=None):
+        """Queue func(*args) and return its Job; raises QueueFull when at capacity
+
+        meta is included in the job's status, key is kept for on_done. If the
+        job cannot be scheduled, it is forgotten again and the error raised.
+        """
+        with self._lock:
+            self._prune()
+            if self.pending >= self.max_pending:
+                self.counts['rejected'] += 1
+                raise QueueFull(f"Too many pending jobs ({self.pending})")
+            job = Job(uuid.uuid4().hex, meta, key, args)
+            self.jobs[job.id] = job
+            self.pending += 1
+
+        try:
+            for attempt in range(2):
+                with self._lock:
+                    pool = self._get_pool()
+                try:
+                    job.future = pool.submit(self.func, *args)
+                    break
+                except BrokenProcessPool:
+                    # A worker died since the last job; retry once on a new pool
+                    self._discard_pool(pool)
+                    if attempt:
+                        raise
+        except BaseException:
+            with self._lock:
+                self.jobs.pop(job.id, None)
+                self.pending -= 1
+            raise
+
+        with self._lock:
+            self.counts['submitted'] += 1
+        job.future.add_done_callback(lambda future: self._finish(job, future, pool))
+        return job
+
+    def complete(self, result, meta=None, timings=None):
+        """Record a job that finished without queueing (e.g. a cache hit)"""
+        with self._lock:
+            self._prune()
+            job = Job(uuid.uuid4().hex, meta)
+            job.status = 'done'
+            job.result = result
+            job.timings = dict(timings or {})
+            job.finished_at = time.time()
+            self.jobs[job.id] = job
+            self.counts['submitted'] += 1
+            self.counts['completed'] += 1
+        return job
+
+    def _finish(self, job, future, pool):
+        try:
+            result, timings = future.result()
+            status = 'done'
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._discard_pool(pool)
+            result, timings = None, {}
+            job.error = str(e) or e.__class__.__name__
+            status = 'failed'
+        timings['queue_seconds'] = round(max(0.0, timings.pop('started_at', job.submitted_at) - job.submitted_at), 4)
+
+        job.result, job.timings = result, timings
+        job.finished_at = time.time()
+        # Set last, so a job reported as finished always has its result
+        job.status = status
+
+        with self._lock:
+            self.pending -= 1
+            self.counts['completed' if job.status == 'done' else 'failed'] += 1
+        job.future = None
+
+        callback = self.on_done if job.status == 'done' else self.on_failed
+        if callback is not None:
+            try:
+                callback(job)
+            except Exception:
+                pass
+
+    def get(self, job_id):
+        """Return the Job with job_id, or None if it is unknown or expired"""
+        with self._lock:
+            self._prune()
+            return self.jobs.get(job_id)
+
+    def _prune(self):
+        """Drop finished jobs older than ttl; jobs are kept in submission order"""
+        cutoff = time.time() - self.ttl
+        for job_id in list(self.jobs):
+            job = self.jobs[job_id]
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self.jobs[job_id]
+            elif job.submitted_at >= cutoff:
+                break
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.counts,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "workers": self.workers,
+                "stored": len(self.jobs)
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def job_queue_from_env(func, initializer=None, on_done=None, on_failed=None):
+    """Create a JobQueue configured by RESUME_JOB_* environment variables"""
+    return JobQueue(
+        func,
+        workers=int(os.getenv('RESUME_JOB_WORKERS', '2')),
+        max_pending=int(os.getenv('RESUME_JOB_QUEUE_DEPTH', '32')),
+        ttl=int(os.getenv('RESUME_JOB_TTL', '3600')),
+        initializer=initializer,
+        on_done=on_done,
+        on_failed=on_failed
+    )
@@ -1,153 +1,387 @@
 import os
 import re
-import spacy
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree.ElementTree import ParseError, iterparse
 import PyPDF2
-from docx import Document
 import json
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Request, request, jsonify, url_for
+from keyword_matcher import KeywordMatcher
+from resume_cache import cache_from_env, cache_key, hash_stream
+from resume_jobs import QueueFull, job_queue_from_env
+from resume_sections import segment_sections, sections_of_kind
+import metrics
+from metrics import stage, timed
 
-# Initialize the spaCy NLP model
-try:
-    nlp = spacy.load("en_core_web_lg")
-except:
-    # If model is not available, download it
-    import subprocess
-    subprocess.call(['python', '-m', 'spacy', 'download', 'en_core_web_lg'])
-    nlp = spacy.load("en_core_web_lg")
+# spaCy model selection. SPACY_MODEL takes a full package name or one of the
+# size shortcuts below. The model is loaded on first use (or by warm_up), so
+# importing this module stays cheap.
+MODEL_ALIASES = {
+    'sm': 'en_core_web_sm',
+    'md': 'en_core_web_md',
+    'lg': 'en_core_web_lg'
+}
+SPACY_MODEL = MODEL_ALIASES.get(os.getenv('SPACY_MODEL', 'lg'), os.getenv('SPACY_MODEL', 'lg'))
+SPACY_AUTO_DOWNLOAD = os.getenv('SPACY_AUTO_DOWNLOAD', '1') == '1'
+
+_nlp = None
+_nlp_error = None
+_nlp_lock = threading.Lock()
+_warm_thread = None
+
+# Pipeline components needed to split a resume into sentences. Everything
+# else in the model (tagger, NER, lemmatizer, ...) is disabled while parsing.
+SENTENCE_COMPONENTS = ('tok2vec', 'parser', 'senter', 'sentencizer')
+
+ALLOWED_EXTENSIONS = {'.pdf', '.docx', '.txt'}
+
+# Upload limits. Files up to RESUME_SPOOL_BYTES are kept in memory, larger
+# ones spool to an anonymous temporary file.
+MAX_FILE_BYTES = int(os.getenv('RESUME_MAX_FILE_BYTES', str(10 * 1024 * 1024)))
+BATCH_MAX_UPLOAD_BYTES = int(os.getenv('RESUME_BATCH_MAX_UPLOAD_BYTES', str(512 * 1024 * 1024)))
+SPOOL_BYTES = int(os.getenv('RESUME_SPOOL_BYTES', str(1024 * 1024)))
+
+# Extraction budget for PDFs (0 disables a limit). A resume never needs more
+# than a few pages; this stops an accidental thesis upload from tying up a worker.
+PDF_MAX_PAGES = int(os.getenv('RESUME_PDF_MAX_PAGES', '30'))
+PDF_MAX_CHARS = int(os.getenv('RESUME_PDF_MAX_CHARS', '200000'))
+
+# Bump whenever extraction output changes so cached results are not reused
+PARSER_VERSION = '5'
+
+# Cache of parse results keyed by the uploaded bytes
+result_cache = cache_from_env()
+
+# Batch parsing settings
+BATCH_MAX_FILES = int(os.getenv('RESUME_BATCH_MAX_FILES', '2000'))
+BATCH_SIZE = int(os.getenv('RESUME_BATCH_SIZE', '32'))
+BATCH_N_PROCESS = int(os.getenv('RESUME_BATCH_N_PROCESS', '1'))
+BATCH_EXTRACT_WORKERS = int(os.getenv('RESUME_BATCH_EXTRACT_WORKERS', str(os.cpu_count() or 1)))
+
+# Keyword matchers, compiled once at import time
+EDUCATION_KEYWORDS = KeywordMatcher([
+    'education', 'academic background', 'degree', 'university',
+    'college', 'school', 'b.tech', 'b.e', 'm.tech', 'm.e',
+    'bachelor', 'master', 'phd', 'doctorate', 'post-graduate',
+    'undergraduate', 'graduate'
+])
+
+CERTIFICATE_KEYWORDS = KeywordMatcher([
+    'certified', 'certificate', 'certification', 'licensed',
+    'accredited', 'diploma'
+])
+
+ACHIEVEMENT_KEYWORDS = KeywordMatcher([
+    'award', 'honor', 'achieve', 'accomplishment', 'recognition',
+    'scholarship', 'fellowship', 'grant', 'prize', 'medal', 'winner',
+    'recipient', 'honored', 'recognized', 'selected'
+])
+
+QUALIFICATION_KEYWORDS = KeywordMatcher([
+    'qualified', 'proficient', 'license', 'permitted',
+    'authorized', 'accredited', 'certified'
+])
+
+# Common skills and technologies, used when a resume has no skills section
+DEFAULT_TECH_SKILLS = [
+    'python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'html', 'css',
+    'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring',
+    'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'oracle', 'firebase',
+    'aws', 'azure', 'gcp', 'cloud', 'docker', 'kubernetes', 'jenkins', 'git',
+    'ci/cd', 'agile', 'scrum', 'machine learning', 'data science', 'ai', 'nlp',
+    'computer vision', 'deep learning', 'tensorflow', 'pytorch', 'keras',
+    'tableau', 'power bi', 'data visualization', 'excel', 'statistics',
+    'blockchain', 'ethereum', 'solidity', 'smart contracts'
+]
+
+# A larger skills taxonomy can be loaded from a file with one term per line
+SKILLS_FILE = os.getenv('RESUME_SKILLS_FILE')
+SKILL_KEYWORDS = KeywordMatcher.from_file(SKILLS_FILE) if SKILLS_FILE else KeywordMatcher(DEFAULT_TECH_SKILLS)
 
 # Create Blueprint
 resume_bp = Blueprint('resume', __name__)
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF file"""
-    text = ""
-    with open(file_path, 'rb') as file:
-        reader = PyPDF2.PdfReader(file)
-        num_pages = len(reader.pages)
-        
-        for page_num in range(num_pages):
-            page = reader.pages[page_num]
-            text += page.extract_text()
-    
-    return text
+class UploadRequest(Request):
+    """Request class that buffers file uploads in memory up to SPOOL_BYTES"""
 
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX file"""
-    doc = Document(file_path)
-    text = ""
-    
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
-    
-    return text
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
 
-def extract_text_from_file(file_path):
-    """Extract text based on file type"""
-    _, file_extension = os.path.splitext(file_path)
+def _load_model(name):
+    """Load a spaCy model, downloading it first if allowed and missing"""
+    import spacy
     
+    try:
+        return spacy.load(name)
+    except OSError:
+        if not SPACY_AUTO_DOWNLOAD:
+            raise
+        subprocess.call([sys.executable, '-m', 'spacy', 'download', name])
+        return spacy.load(name)
+
+def get_nlp():
+    """Return the spaCy pipeline, loading it on first use"""
+    global _nlp, _nlp_error
+    
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                try:
+                    _nlp = _load_model(SPACY_MODEL)
+                    _nlp_error = None
+                except Exception as e:
+                    _nlp_error = str(e)
+                    raise
+    return _nlp
+
+def warm_up():
+    """Start loading the spaCy model in a background thread"""
+    global _warm_thread
+    
+    def load():
+        try:
+            get_nlp()
+        except Exception:
+            pass  # Recorded in _nlp_error and reported by /ready
+    
+    with _nlp_lock:
+        if _nlp is None and (_warm_thread is None or not _warm_thread.is_alive()):
+            _warm_thread = threading.Thread(target=load, name='spacy-warm-up', daemon=True)
+            _warm_thread.start()
+
+def model_status():
+    """Describe whether the spaCy model is loaded, loading or failed"""
+    return {
+        "ready": _nlp is not None,
+        "loading": _nlp is None and _warm_thread is not None and _warm_thread.is_alive(),
+        "model": SPACY_MODEL,
+        "error": _nlp_error
+    }
+
+def disabled_components():
+    """Names of the pipeline components not needed for sentence splitting"""
+    return [name for name in get_nlp().pipe_names if name not in SENTENCE_COMPONENTS]
+
+class ParseContext:
+    """Shared per-resume state so the spaCy pipeline and section scan run at most once"""
+
+    def __init__(self, text, doc=None):
+        self.text = text
+        self._doc = doc
+        self._sentences = None
+        self._sections = None
+
+    @property
+    def doc(self):
+        """spaCy Doc for the text, parsed on first access"""
+        if self._doc is None:
+            nlp = get_nlp()
+            with stage('spacy'):
+                self._doc = nlp(self.text, disable=disabled_components())
+        return self._doc
+
+    @property
+    def sentences(self):
+        """Sentence strings of the text, created on first access"""
+        if self._sentences is None:
+            self._sentences = [sent.text for sent in self.doc.sents]
+        return self._sentences
+
+    @property
+    def sections(self):
+        """Sections of the text, segmented on first access"""
+        if self._sections is None:
+            self._sections = segment_sections(self.text)
+        return self._sections
+
+def iter_pdf_pages(source, max_pages=0):
+    """Yield the text of each PDF page in order, stopping after max_pages"""
+    reader = PyPDF2.PdfReader(source)
+    
+    for page_num, page in enumerate(reader.pages):
+        if max_pages and page_num >= max_pages:
+            break
+        yield page.extract_text() or ""
+
+@timed('extract_pdf')
+def extract_text_from_pdf(source, max_pages=None, max_chars=None):
+    """Extract text from a PDF file path or binary stream within a page/char budget"""
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    
+    pages = []
+    length = 0
+    
+    for page_text in iter_pdf_pages(source, max_pages):
+        if max_chars and length + len(page_text) >= max_chars:
+            # Stop reading as soon as the character budget is used up
+            pages.append(page_text[:max_chars - length])
+            break
+        pages.append(page_text)
+        length += len(page_text) + 1
+    
+    metrics.PDF_PAGES.observe(len(pages))
+    return "\n".join(pages)
+
+# WordprocessingML elements read by the DOCX extractor
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_PARAGRAPH = WORD_NS + 'p'
+DOCX_TABLE = WORD_NS + 'tbl'
+DOCX_TEXT = WORD_NS + 't'
+# Run content other than text, as python-docx renders it
+DOCX_RUN_CHARACTERS = {
+    WORD_NS + 'tab': '\t',
+    WORD_NS + 'br': '\n',
+    WORD_NS + 'cr': '\n',
+    WORD_NS + 'noBreakHyphen': '-',
+}
+# Alternative renderings of drawings and text boxes that repeat their text
+DOCX_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+def iter_docx_paragraphs(source):
+    """Yield the text of each paragraph of a DOCX file path or binary stream, in document order
+
+    word/document.xml is streamed with iterparse and every paragraph and
+    table is dropped from the tree once read, so memory stays flat however
+    large the document is. Paragraphs inside table cells (and text boxes)
+    are yielded like any other, one per cell paragraph.
+    """
+    try:
+        with zipfile.ZipFile(source) as archive, archive.open('word/document.xml') as document:
+            # Elements open at this point; paragraphs collect their text in open_paragraphs
+            open_elements = []
+            open_paragraphs = []
+            fallback_depth = 0
+            
+            for event, element in iterparse(document, events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    open_elements.append(element)
+                    if tag == DOCX_FALLBACK:
+                        fallback_depth += 1
+                    elif tag == DOCX_PARAGRAPH and not fallback_depth:
+                        open_paragraphs.append([])
+                    continue
+                
+                open_elements.pop()
+                if tag == DOCX_FALLBACK:
+                    fallback_depth -= 1
+                elif fallback_depth or not open_paragraphs:
+                    pass
+                elif tag == DOCX_TEXT:
+                    open_paragraphs[-1].append(element.text or '')
+                elif tag in DOCX_RUN_CHARACTERS:
+                    open_paragraphs[-1].append(DOCX_RUN_CHARACTERS[tag])
+                elif tag == DOCX_PARAGRAPH:
+                    yield ''.join(open_paragraphs.pop())
+                
+                if tag in (DOCX_PARAGRAPH, DOCX_TABLE):
+                    element.clear()
+                    if open_elements:
+                        open_elements[-1].remove(element)
+    except (zipfile.BadZipFile, KeyError, ParseError) as e:
+        raise ValueError(f"Not a valid DOCX file: {e}")
+
+@timed('extract_docx')
+def extract_text_from_docx(source):
+    """Extract text from a DOCX file path or binary stream, including table cells"""
+    lines = list(iter_docx_paragraphs(source))
+    return "\n".join(lines) + "\n" if lines else ""
+
+@timed('extract_txt')
+def extract_text_from_txt(source):
+    """Extract text from a TXT file path or binary stream"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8', errors='ignore') as file:
+            return file.read()
+    return source.read().decode('utf-8', errors='ignore')
+
+def extract_text(source, file_extension):
+    """Extract text from a file path or binary stream of the given type"""
     if file_extension.lower() == '.pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(source)
     elif file_extension.lower() == '.docx':
-        return extract_text_from_docx(file_path)
+        return extract_text_from_docx(source)
     elif file_extension.lower() == '.txt':
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            return file.read()
+        return extract_text_from_txt(source)
     else:
         raise ValueError(f"Unsupported file format: {file_extension}")
 
-def extract_education(text):
+def extract_text_from_file(file_path):
+    """Extract text based on file type"""
+    _, file_extension = os.path.splitext(file_path)
+    return extract_text(file_path, file_extension)
+
+@timed('extract_education')
+def extract_education(text, ctx=None):
     """Extract education details from text"""
     education = []
-    
-    # Define education-related keywords
-    education_keywords = [
-        r'education', r'academic background', r'degree', r'university', 
-        r'college', r'school', r'b\.tech', r'b\.e', r'm\.tech', r'm\.e',
-        r'bachelor', r'master', r'phd', r'doctorate', r'post-graduate',
-        r'undergraduate', r'graduate'
-    ]
-    
-    # Create a pattern to find education section
-    education_pattern = r'(?i)(EDUCATION|ACADEMIC BACKGROUND|QUALIFICATIONS).*?\n(.*?)(?:\n\n|\Z)'
-    
-    # Process the text with spaCy
-    doc = nlp(text)
+    ctx = ctx or ParseContext(text)
     
     # Try to find education section
-    education_sections = re.findall(education_pattern, text, re.DOTALL)
+    education_sections = sections_of_kind(ctx.sections, 'education')
     
     if education_sections:
-        for section_title, section_content in education_sections:
-            # Split by newlines to get individual entries
-            entries = [e.strip() for e in section_content.split('\n') if e.strip()]
-            for entry in entries:
-                education.append(entry)
+        for section in education_sections:
+            # Each line is an individual entry
+            education.extend(section.lines)
     else:
         # If no clear education section, look for sentences with education keywords
-        sentences = [sent.text for sent in doc.sents]
-        for sentence in sentences:
-            for keyword in education_keywords:
-                if re.search(r'\b' + keyword + r'\b', sentence, re.IGNORECASE):
-                    education.append(sentence.strip())
-                    break
+        for sentence in ctx.sentences:
+            if EDUCATION_KEYWORDS.search(sentence):
+                education.append(sentence.strip())
     
     # Remove duplicates
     education = list(set(education))
     
     return education
 
-def extract_skills(text):
+@timed('extract_skills')
+def extract_skills(text, ctx=None):
     """Extract skills from text"""
     skills = []
-    
-    # Define common skills and technologies
-    tech_skills = [
-        'python', 'java', 'javascript', 'c\+\+', 'c#', 'ruby', 'php', 'html', 'css',
-        'react', 'angular', 'vue', 'node\.js', 'express', 'django', 'flask', 'spring',
-        'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'oracle', 'firebase',
-        'aws', 'azure', 'gcp', 'cloud', 'docker', 'kubernetes', 'jenkins', 'git',
-        'ci/cd', 'agile', 'scrum', 'machine learning', 'data science', 'ai', 'nlp',
-        'computer vision', 'deep learning', 'tensorflow', 'pytorch', 'keras', 
-        'tableau', 'power bi', 'data visualization', 'excel', 'statistics',
-        'blockchain', 'ethereum', 'solidity', 'smart contracts'
-    ]
+    ctx = ctx or ParseContext(text)
     
     # Try to find skills section
-    skills_pattern = r'(?i)(SKILLS|TECHNICAL SKILLS|TECHNOLOGIES|COMPETENCIES).*?\n(.*?)(?:\n\n|\Z)'
-    skills_sections = re.findall(skills_pattern, text, re.DOTALL)
+    skills_sections = sections_of_kind(ctx.sections, 'skills')
     
     if skills_sections:
-        for section_title, section_content in skills_sections:
+        for section in skills_sections:
             # Look for skill items - often separated by commas, bullets, or newlines
-            items = re.split(r'[,•\n]', section_content)
+            items = re.split(r'[,•\n]', section.content)
             for item in items:
                 if item.strip():
                     skills.append(item.strip())
     else:
         # If no clear skills section, look for known tech skills
-        for skill in tech_skills:
-            if re.search(r'\b' + skill + r'\b', text, re.IGNORECASE):
-                match = re.search(r'\b' + skill + r'\b', text, re.IGNORECASE)
-                skills.append(match.group(0))
+        skills.extend(SKILL_KEYWORDS.find_all(text))
     
     # Remove duplicates
     skills = list(set(skills))
     
     return skills
 
-def extract_experience(text):
+@timed('extract_experience')
+def extract_experience(text, ctx=None):
     """Extract work experience from text"""
     experience = []
+    ctx = ctx or ParseContext(text)
     
     # Try to find experience section
-    exp_pattern = r'(?i)(EXPERIENCE|WORK EXPERIENCE|EMPLOYMENT|PROFESSIONAL EXPERIENCE).*?\n(.*?)(?:\n\n|\Z)'
-    exp_sections = re.findall(exp_pattern, text, re.DOTALL)
+    exp_sections = sections_of_kind(ctx.sections, 'experience')
     
     if exp_sections:
-        for section_title, section_content in exp_sections:
+        for section in exp_sections:
             # Try to identify individual positions - often start with a company name or role
             # This is a simple approach; more sophisticated parsing would be needed for better results
-            positions = re.split(r'\n(?=[A-Z])', section_content)
+            positions = re.split(r'\n(?=[A-Z])', section.content)
             for position in positions:
                 if len(position.strip()) > 10:  # Arbitrary length to filter out noise
                     experience.append(position.strip())
@@ -178,99 +412,68 @@ def extract_experience(text):
     
     return experience
 
-def extract_certificates(text):
+@timed('extract_certificates')
+def extract_certificates(text, ctx=None):
     """Extract certifications from text"""
     certifications = []
+    ctx = ctx or ParseContext(text)
     
     # Try to find certifications section
-    cert_pattern = r'(?i)(CERTIFICATIONS|CERTIFICATES|PROFESSIONAL DEVELOPMENT).*?\n(.*?)(?:\n\n|\Z)'
-    cert_sections = re.findall(cert_pattern, text, re.DOTALL)
+    cert_sections = sections_of_kind(ctx.sections, 'certifications')
     
     if cert_sections:
-        for section_title, section_content in cert_sections:
-            # Split by newlines to get individual certificates
-            certs = [c.strip() for c in section_content.split('\n') if c.strip()]
-            certifications.extend(certs)
+        for section in cert_sections:
+            # Each line is an individual certificate
+            certifications.extend(section.lines)
     else:
         # Look for common certification keywords
-        cert_keywords = [
-            r'certified', r'certificate', r'certification', r'licensed', 
-            r'accredited', r'diploma'
-        ]
-        
-        doc = nlp(text)
-        sentences = [sent.text for sent in doc.sents]
-        
-        for sentence in sentences:
-            for keyword in cert_keywords:
-                if re.search(r'\b' + keyword + r'\b', sentence, re.IGNORECASE):
-                    certifications.append(sentence.strip())
-                    break
+        for sentence in ctx.sentences:
+            if CERTIFICATE_KEYWORDS.search(sentence):
+                certifications.append(sentence.strip())
     
     return certifications
 
-def extract_achievements(text):
+@timed('extract_achievements')
+def extract_achievements(text, ctx=None):
     """Extract achievements from text"""
     achievements = []
+    ctx = ctx or ParseContext(text)
     
     # Try to find achievements section
-    achieve_pattern = r'(?i)(ACHIEVEMENTS|ACCOMPLISHMENTS|AWARDS|HONORS).*?\n(.*?)(?:\n\n|\Z)'
-    achieve_sections = re.findall(achieve_pattern, text, re.DOTALL)
+    achieve_sections = sections_of_kind(ctx.sections, 'achievements')
     
     if achieve_sections:
-        for section_title, section_content in achieve_sections:
-            # Split by newlines to get individual achievements
-            items = [a.strip() for a in section_content.split('\n') if a.strip()]
-            achievements.extend(items)
+        for section in achieve_sections:
+            # Each line is an individual achievement
+            achievements.extend(section.lines)
     else:
         # Look for achievement-related keywords in sentences
-        achievement_keywords = [
-            r'award', r'honor', r'achieve', r'accomplishment', r'recognition',
-            r'scholarship', r'fellowship', r'grant', r'prize', r'medal', r'winner',
-            r'recipient', r'honored', r'recognized', r'selected'
-        ]
-        
-        doc = nlp(text)
-        sentences = [sent.text for sent in doc.sents]
-        
-        for sentence in sentences:
-            for keyword in achievement_keywords:
-                if re.search(r'\b' + keyword + r'\b', sentence, re.IGNORECASE):
-                    achievements.append(sentence.strip())
-                    break
+        for sentence in ctx.sentences:
+            if ACHIEVEMENT_KEYWORDS.search(sentence):
+                achievements.append(sentence.strip())
     
     return achievements
 
-def extract_qualifications(text):
+@timed('extract_qualifications')
+def extract_qualifications(text, ctx=None):
     """Extract qualifications from text"""
     qualifications = []
+    ctx = ctx or ParseContext(text)
     
     # Try to find qualifications section
-    qual_pattern = r'(?i)(QUALIFICATIONS|PROFESSIONAL QUALIFICATIONS).*?\n(.*?)(?:\n\n|\Z)'
-    qual_sections = re.findall(qual_pattern, text, re.DOTALL)
+    qual_sections = sections_of_kind(ctx.sections, 'qualifications')
     
     if qual_sections:
-        for section_title, section_content in qual_sections:
-            # Split by newlines to get individual qualifications
-            items = [q.strip() for q in section_content.split('\n') if q.strip()]
-            qualifications.extend(items)
+        for section in qual_sections:
+            # Each line is an individual qualification
+            qualifications.extend(section.lines)
     else:
         # This could overlap with education or certifications
         # We'll look for specific qualification keywords
-        qual_keywords = [
-            r'qualified', r'proficient', r'license', r'permitted', 
-            r'authorized', r'accredited', r'certified'
-        ]
-        
-        doc = nlp(text)
-        sentences = [sent.text for sent in doc.sents]
-        
-        for sentence in sentences:
-            for keyword in qual_keywords:
-                if re.search(r'\b' + keyword + r'\b', sentence, re.IGNORECASE):
-                    if sentence.strip() not in qualifications:
-                        qualifications.append(sentence.strip())
-                    break
+        for sentence in ctx.sentences:
+            if QUALIFICATION_KEYWORDS.search(sentence):
+                if sentence.strip() not in qualifications:
+                    qualifications.append(sentence.strip())
     
     # Remove duplicates that might be in education already
     # (This is a simple approach; more sophisticated de-duplication might be needed)
@@ -283,13 +486,23 @@ def parse_resume(file_path):
     # Extract text from file
     text = extract_text_from_file(file_path)
     
+    return parse_resume_text(text)
+
+def parse_resume_text(text, ctx=None):
+    """Run every extractor over already extracted resume text"""
+    
+    metrics.TEXT_CHARACTERS.observe(len(text))
+    
+    # Share one spaCy parse between all extractors
+    ctx = ctx or ParseContext(text)
+    
     # Extract various components
-    education = extract_education(text)
-    skills = extract_skills(text)
-    experience = extract_experience(text)
-    certifications = extract_certificates(text)
-    achievements = extract_achievements(text)
-    qualifications = extract_qualifications(text)
+    education = extract_education(text, ctx)
+    skills = extract_skills(text, ctx)
+    experience = extract_experience(text, ctx)
+    certifications = extract_certificates(text, ctx)
+    achievements = extract_achievements(text, ctx)
+    qualifications = extract_qualifications(text, ctx)
     
     # Combine into result
     result = {
@@ -303,43 +516,348 @@ def parse_resume(file_path):
     
     return result
 
-@resume_bp.route('/parse', methods=['POST'])
-def parse_resume_api():
-    """API endpoint to parse resume"""
+def _read_upload():
+    """Validate the uploaded 'file' and hash it; returns (file, file_ext, cache key) or an error response"""
     
     # Check if file is in request
     if 'file' not in request.files:
-        return jsonify({"error": "No file provided"}), 400
+        return None, (jsonify({"error": "No file provided"}), 400)
     
     file = request.files['file']
     
     # Check if file has a name
     if file.filename == '':
-        return jsonify({"error": "No file selected"}), 400
+        return None, (jsonify({"error": "No file selected"}), 400)
     
     # Check file extension
-    allowed_extensions = {'.pdf', '.docx', '.txt'}
     file_ext = os.path.splitext(file.filename)[1].lower()
     
-    if file_ext not in allowed_extensions:
-        return jsonify({"error": f"File type not supported. Allowed types: {', '.join(allowed_extensions)}"}), 400
+    if file_ext not in ALLOWED_EXTENSIONS:
+        return None, (jsonify({"error": f"File type not supported. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"}), 400)
+    
+    # Hash the upload in place
+    digest, size = hash_stream(file.stream)
+    if size > MAX_FILE_BYTES:
+        return None, (jsonify({"error": f"File too large. The limit is {MAX_FILE_BYTES} bytes"}), 413)
+    
+    return (file, file_ext, cache_key(digest, file_ext, PARSER_VERSION)), None
+
+@resume_bp.route('/parse', methods=['POST'])
+def parse_resume_api():
+    """API endpoint to parse resume"""
+    
+    # Reject oversized bodies before the upload is read
+    request.max_content_length = MAX_FILE_BYTES + 64 * 1024
     
-    # Create a temporary path to save the file
-    temp_path = os.path.join('/tmp', file.filename)
-    file.save(temp_path)
+    upload, error = _read_upload()
+    if error:
+        return error
+    file, file_ext, key = upload
+    
+    # Return the cached result if these exact bytes were parsed before
+    cached = result_cache.get(key)
+    metrics.CACHE_REQUESTS.inc(result='miss' if cached is None else 'hit')
+    if cached is not None:
+        return jsonify(cached), 200
     
     try:
-        # Parse the resume
-        result = parse_resume(temp_path)
-        
-        # Delete the temporary file
-        os.remove(temp_path)
+        # Parse the resume straight from the upload stream; it is never written to a named file
+        file.stream.seek(0)
+        result = parse_resume_text(extract_text(file.stream, file_ext))
+        result_cache.put(key, result)
         
         return jsonify(result), 200
     
     except Exception as e:
-        # Clean up in case of error
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        return jsonify({"error": str(e)}), 500
+    
+    finally:
+        file.close()
+
+def _init_job_worker():
+    """Load the spaCy model once in each job worker process"""
+    global _nlp_lock
+    
+    # A forked worker may inherit the lock while warm_up held it in the parent
+    _nlp_lock = threading.Lock()
+    try:
+        get_nlp()
+    except Exception:
+        # Reported by the jobs that need it
+        pass
+
+def _run_parse_job(file_path, file_ext):
+    """Parse a saved upload in a job worker; returns (result, timings)"""
+    started_at = time.time()
+    try:
+        with metrics.collect_stages() as stages:
+            wall, cpu = time.perf_counter(), time.process_time()
+            text = extract_text(file_path, file_ext)
+            extracted_wall, extracted_cpu = time.perf_counter(), time.process_time()
+            result = parse_resume_text(text)
         
+        return result, {
+            "started_at": started_at,
+            "extract_seconds": round(extracted_wall - wall, 4),
+            "extract_cpu_seconds": round(extracted_cpu - cpu, 4),
+            "parse_seconds": round(time.perf_counter() - extracted_wall, 4),
+            "parse_cpu_seconds": round(time.process_time() - extracted_cpu, 4),
+            "text_length": len(text),
+            "stages": metrics.summarize_stages(stages)
+        }
+    finally:
+        os.remove(file_path)
+
+def _job_done(job):
+    """Cache a finished job's result and record its worker's stage timings"""
+    if job.key:
+        result_cache.put(job.key, job.result)
+    metrics.record_summary(job.timings.get("stages"))
+    metrics.TEXT_CHARACTERS.observe(job.timings.get("text_length", 0))
+
+def _job_failed(job):
+    """Remove the upload of a job whose worker died before it could"""
+    if os.path.exists(job.args[0]):
+        os.remove(job.args[0])
+
+# Background parsing queue; worker processes start on the first job
+job_queue = job_queue_from_env(
+    _run_parse_job, initializer=_init_job_worker, on_done=_job_done, on_failed=_job_failed
+)
+
+@resume_bp.route('/jobs', methods=['POST'])
+def submit_resume_job_api():
+    """API endpoint to queue a resume for parsing; poll the returned status_url for the result"""
+    
+    request.max_content_length = MAX_FILE_BYTES + 64 * 1024
+    
+    upload, error = _read_upload()
+    if error:
+        return error
+    file, file_ext, key = upload
+    meta = {"filename": file.filename}
+    
+    try:
+        cached = result_cache.get(key)
+        metrics.CACHE_REQUESTS.inc(result='miss' if cached is None else 'hit')
+        if cached is not None:
+            job = job_queue.complete(cached, meta=meta, timings={"cached": True})
+        else:
+            # Workers read the upload from a named temporary file, which they delete
+            fd, path = tempfile.mkstemp(prefix='resume-job-', suffix=file_ext)
+            with os.fdopen(fd, 'wb') as saved:
+                file.stream.seek(0)
+                shutil.copyfileobj(file.stream, saved)
+            try:
+                job = job_queue.submit(path, file_ext, meta=meta, key=key)
+            except QueueFull as e:
+                os.remove(path)
+                return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
+            except Exception as e:
+                os.remove(path)
+                return jsonify({"error": str(e)}), 500
+    finally:
+        file.close()
+    
+    status_url = url_for('resume.resume_job_status_api', job_id=job.id)
+    response = jsonify({**job.to_dict(), "status_url": status_url})
+    response.headers['Location'] = status_url
+    return response, 200 if cached is not None else 202
+
+@resume_bp.route('/jobs/<job_id>', methods=['GET'])
+def resume_job_status_api(job_id):
+    """API endpoint reporting a parsing job's status, timings and, once done, its result"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+@resume_bp.route('/jobs/stats', methods=['GET'])
+def resume_job_stats_api():
+    """API endpoint reporting job queue depth and counts"""
+    return jsonify(job_queue.stats()), 200
+
+@resume_bp.errorhandler(413)
+def upload_too_large(e):
+    """Return upload size errors as JSON"""
+    return jsonify({"error": "Upload too large"}), 413
+
+@resume_bp.route('/ready', methods=['GET'])
+def ready_api():
+    """Readiness endpoint: 200 once the spaCy model is loaded, 503 before"""
+    status = model_status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+@resume_bp.route('/cache/stats', methods=['GET'])
+def cache_stats_api():
+    """API endpoint reporting parse cache hits, misses and size"""
+    return jsonify(result_cache.stats()), 200
+
+def parse_resume_batch(texts):
+    """Parse many resume texts, streaming them through nlp.pipe"""
+    docs = get_nlp().pipe(
+        texts,
+        batch_size=BATCH_SIZE,
+        n_process=BATCH_N_PROCESS,
+        disable=disabled_components()
+    )
+    return [parse_resume_text(text, ParseContext(text, doc)) for text, doc in zip(texts, docs)]
+
+def _extract_text_safe(file_path):
+    """Extract text in a worker process, returning (text, error)"""
+    try:
+        return extract_text_from_file(file_path), None
+    except Exception as e:
+        return None, str(e)
+
+# Text extraction pool shared by all batch requests, started on first use, so
+# concurrent batches queue on at most BATCH_EXTRACT_WORKERS processes
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
+
+def _extract_texts(paths):
+    """Extract the text of each path on the shared pool; returns {path: (text, error)}"""
+    global _extract_pool
+    if not paths:
+        return {}
+    for attempt in range(2):
+        with _extract_pool_lock:
+            if _extract_pool is None:
+                _extract_pool = ProcessPoolExecutor(max_workers=max(1, BATCH_EXTRACT_WORKERS))
+            pool = _extract_pool
+        try:
+            return dict(zip(paths, pool.map(_extract_text_safe, paths)))
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); extraction is retried once on a new pool
+            with _extract_pool_lock:
+                if _extract_pool is pool:
+                    _extract_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            if attempt:
+                raise
+
+class BatchTooLarge(Exception):
+    """A batch upload is over the file count or size limits"""
+
+def _copy_limited(source, out, limit):
+    """Copy at most limit bytes; returns False if source had more"""
+    remaining = limit
+    while True:
+        chunk = source.read(min(1024 * 1024, remaining + 1))
+        if not chunk:
+            return True
+        if len(chunk) > remaining:
+            return False
+        out.write(chunk)
+        remaining -= len(chunk)
+
+def _batch_members(archive):
+    """Zip members to parse, checked against the limits before anything is extracted"""
+    members = [
+        member for member in archive.infolist()
+        if not member.is_dir() and not member.filename.startswith('__MACOSX/')
+    ]
+    if len(members) > BATCH_MAX_FILES:
+        raise BatchTooLarge(f"Too many files, the limit is {BATCH_MAX_FILES}")
+    if sum(member.file_size for member in members) > BATCH_MAX_UPLOAD_BYTES:
+        raise BatchTooLarge(f"Archive too large when extracted. The limit is {BATCH_MAX_UPLOAD_BYTES} bytes")
+    return members
+
+def _save_batch_uploads(files, temp_dir):
+    """Save uploaded files and zip members to temp_dir as (name, path, error) items
+
+    Raises BatchTooLarge as soon as the batch is over BATCH_MAX_FILES files or
+    BATCH_MAX_UPLOAD_BYTES bytes extracted; zip members are counted and their
+    declared sizes checked before any is written, and copies stop at the limits
+    whatever the sizes in the archive claim.
+    """
+    items = []
+    written = 0
+    
+    def add(name, source, size=None):
+        nonlocal written
+        if len(items) >= BATCH_MAX_FILES:
+            raise BatchTooLarge(f"Too many files, the limit is {BATCH_MAX_FILES}")
+        # Use a generated name on disk so user-supplied paths never escape temp_dir
+        file_ext = os.path.splitext(name)[1].lower()
+        if file_ext not in ALLOWED_EXTENSIONS:
+            items.append((name, None, f"File type not supported: {file_ext or name}"))
+            return
+        too_large = f"File too large. The limit is {MAX_FILE_BYTES} bytes"
+        if size is not None and size > MAX_FILE_BYTES:
+            items.append((name, None, too_large))
+            return
+        path = os.path.join(temp_dir, f"{len(items)}{file_ext}")
+        limit = min(MAX_FILE_BYTES, BATCH_MAX_UPLOAD_BYTES - written)
+        with open(path, 'wb') as out:
+            complete = _copy_limited(source, out, limit)
+            written += out.tell()
+        if not complete:
+            os.remove(path)
+            if limit < MAX_FILE_BYTES:
+                raise BatchTooLarge(f"Batch too large when extracted. The limit is {BATCH_MAX_UPLOAD_BYTES} bytes")
+            items.append((name, None, too_large))
+            return
+        items.append((name, path, None))
+    
+    for file in files:
+        if not file.filename:
+            continue
+        if os.path.splitext(file.filename)[1].lower() == '.zip':
+            try:
+                with zipfile.ZipFile(file.stream) as archive:
+                    for member in _batch_members(archive):
+                        with archive.open(member) as source:
+                            add(member.filename, source, member.file_size)
+            except zipfile.BadZipFile:
+                items.append((file.filename, None, "Invalid zip archive"))
+        else:
+            add(file.filename, file.stream)
+    
+    return items
+
+@resume_bp.route('/parse-batch', methods=['POST'])
+def parse_resume_batch_api():
+    """API endpoint to parse many resumes, uploaded as files and/or zip archives"""
+    
+    request.max_content_length = BATCH_MAX_UPLOAD_BYTES
+    
+    files = request.files.getlist('files') + request.files.getlist('file')
+    if not files:
+        return jsonify({"error": "No files provided"}), 400
+    
+    temp_dir = tempfile.mkdtemp(prefix='resume-batch-')
+    
+    try:
+        items = _save_batch_uploads(files, temp_dir)
+        
+        if not items:
+            return jsonify({"error": "No files selected"}), 400
+        
+        # Extract text in parallel; PDF and DOCX extraction is CPU bound
+        paths = [path for _, path, error in items if error is None]
+        extracted = _extract_texts(paths)
+        
+        # Run spaCy over every successfully extracted text in one stream
+        texts = [extracted[path][0] for path in paths if extracted[path][1] is None]
+        parsed = iter(parse_resume_batch(texts))
+        
+        results = []
+        for name, path, error in items:
+            if error is None:
+                error = extracted[path][1]
+            if error is None:
+                results.append({"filename": name, "result": next(parsed)})
+            else:
+                results.append({"filename": name, "error": error})
+        
+        return jsonify({"count": len(results), "results": results}), 200
+    
+    except BatchTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    
+    except Exception as e:
         return jsonify({"error": str(e)}), 500
+    
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
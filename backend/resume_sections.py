@@ -0,0 +1,148 @@
+"""Single-pass section segmentation for resumes
+
+The text is scanned line by line once. A line is a heading when it is short,
+looks like a title (upper case, title case or ending in ':') and either
+contains a section keyword, is the whole name of another common section
+(Publications, Projects, ...) or is in upper case after a blank line. Each
+section runs from the line after its
+heading to the next heading of any kind, so an extractor never reads into a
+section it does not know, and every extractor reads its sections from the
+same spans instead of running its own regular expression over the whole text.
+"""
+import re
+
+from keyword_matcher import KeywordMatcher, normalize_term
+
+# Heading terms for each section kind; a heading may belong to several kinds
+SECTION_HEADINGS = {
+    'education': ['education', 'academic background', 'qualifications'],
+    'skills': ['skills', 'technical skills', 'technologies', 'competencies'],
+    'experience': ['experience', 'experiences', 'work experience', 'employment',
+                   'professional experience'],
+    'certifications': ['certifications', 'certificates', 'professional development'],
+    'achievements': ['achievements', 'accomplishments', 'awards', 'honors', 'honours'],
+    'qualifications': ['qualifications', 'professional qualifications'],
+}
+
+# Resume sections no extractor reads; their headings only end the section
+# before them. A line must be exactly one of these (after decoration), so
+# sub-headings such as "Programming Languages" inside a section do not count
+OTHER_HEADINGS = {
+    'summary', 'professional summary', 'profile', 'objective', 'career objective', 'about me',
+    'publications', 'selected publications', 'projects', 'personal projects', 'research',
+    'research interests', 'interests', 'hobbies', 'hobbies and interests', 'languages',
+    'references', 'activities', 'extracurricular activities', 'leadership', 'volunteering',
+    'teaching', 'presentations', 'talks', 'conferences', 'patents', 'memberships',
+    'affiliations', 'professional affiliations', 'contact', 'contact information',
+    'personal information', 'personal details', 'coursework', 'relevant coursework', 'grants',
+}
+
+# Headings are short: at most this many characters and words
+MAX_HEADING_LENGTH = 50
+MAX_HEADING_WORDS = 5
+
+# Letters an unknown upper-case heading needs, so acronyms are not headings
+MIN_UPPER_HEADING_LETTERS = 4
+
+# Words allowed in lower case inside a title-case heading
+CONNECTORS = {'and', 'of', 'the', 'in', '&', '/', '-'}
+
+HEADING_KEYWORDS = KeywordMatcher(term for terms in SECTION_HEADINGS.values() for term in terms)
+TERM_KINDS = {}
+for _kind, _terms in SECTION_HEADINGS.items():
+    for _term in _terms:
+        TERM_KINDS.setdefault(normalize_term(_term), []).append(_kind)
+
+# Bullets, numbering and markdown markers before a heading, and ':' after it
+HEADING_DECORATION = re.compile(r'^[\s#*•\-–—\d.)]*|[\s:*]*$')
+
+
+class Section:
+    """One section: its kinds, heading and the offsets of its content"""
+
+    def __init__(self, kinds, title, start, end, text):
+        self.kinds = kinds
+        self.title = title
+        self.start = start
+        self.end = end
+        self._text = text
+
+    @property
+    def content(self):
+        """Section text without the heading"""
+        return self._text[self.start:self.end].strip('\n')
+
+    @property
+    def lines(self):
+        """Non-empty, stripped content lines"""
+        return [line.strip() for line in self.content.split('\n') if line.strip()]
+
+
+def heading_kinds(line, after_blank=False):
+    """Return the section kinds a line is a heading for: None if it is no
+    heading, an empty list for the heading of a section no extractor reads
+
+    after_blank says the line follows a blank line (or starts the text).
+    """
+    if len(line) > MAX_HEADING_LENGTH or ',' in line:
+        return None
+
+    title = HEADING_DECORATION.sub('', line)
+    words = title.split()
+    if not words or len(words) > MAX_HEADING_WORDS:
+        return None
+
+    looks_like_title = (
+        title.isupper()
+        or line.rstrip().endswith(':')
+        or all(word[0].isupper() or word.lower() in CONNECTORS for word in words)
+    )
+    if not looks_like_title:
+        return None
+
+    kinds = []
+    for term in HEADING_KEYWORDS.find_all(title):
+        for kind in TERM_KINDS[normalize_term(term)]:
+            if kind not in kinds:
+                kinds.append(kind)
+    if kinds:
+        return kinds
+    name = ' '.join('and' if word == '&' else word for word in words).lower()
+    if name in OTHER_HEADINGS:
+        return kinds
+    # Any other upper-case line opening a block (but not an acronym like "MIT")
+    if after_blank and title.isupper() and sum(char.isalpha() for char in title) >= MIN_UPPER_HEADING_LETTERS:
+        return kinds
+    return None
+
+
+def segment_sections(text):
+    """Split text into Sections in one pass over its lines"""
+    sections = []
+    current = None
+    position = 0
+    length = len(text)
+    after_blank = True
+
+    while position <= length:
+        line_end = text.find('\n', position)
+        if line_end == -1:
+            line_end = length
+
+        line = text[position:line_end]
+        kinds = heading_kinds(line, after_blank)
+        if kinds is not None:
+            if current is not None:
+                current.end = position
+            current = Section(kinds, line.strip(), line_end + 1, length, text)
+            sections.append(current)
+
+        after_blank = not line.strip()
+        position = line_end + 1
+
+    return sections
+
+
+def sections_of_kind(sections, kind):
+    """Sections belonging to kind, in document order"""
+    return [section for section in sections if kind in section.kinds]
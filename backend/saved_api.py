@@ -0,0 +1,113 @@
+"""Saved-opportunity endpoints
+
+Requests carry the user's Supabase access token as "Authorization: Bearer
+<token>"; the user id is the token's subject. Tokens are verified with
+SUPABASE_JWT_SECRET (HS256) or, without it, against the project's JWKS at
+SUPABASE_URL. Storage is chosen by SAVED_STORE (see saved_store.py).
+"""
+import os
+from functools import wraps
+
+import jwt
+from flask import Blueprint, g, jsonify, request
+
+from opportunities.engine import BATCH_LOOKUP_LIMIT
+from opportunities.store import parse_ids
+from saved_store import SavedCache, saved_store_from_env
+
+saved_bp = Blueprint('saved', __name__)
+
+SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET', '')
+SUPABASE_URL = os.getenv('SUPABASE_URL', '')
+JWT_AUDIENCE = os.getenv('SUPABASE_JWT_AUDIENCE', 'authenticated')
+
+saved_cache = SavedCache(
+    saved_store_from_env(),
+    max_users=int(os.getenv('SAVED_CACHE_USERS', '1024')),
+    ttl=int(os.getenv('SAVED_CACHE_TTL', '300'))
+)
+
+_jwks_client = None
+
+
+def verify_token(token):
+    """Return the user id of a Supabase access token; raises jwt.InvalidTokenError"""
+    global _jwks_client
+    if SUPABASE_JWT_SECRET:
+        key, algorithms = SUPABASE_JWT_SECRET, ['HS256']
+    elif SUPABASE_URL:
+        if _jwks_client is None:
+            _jwks_client = jwt.PyJWKClient(f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json")
+        key, algorithms = _jwks_client.get_signing_key_from_jwt(token).key, ['RS256', 'ES256']
+    else:
+        raise jwt.InvalidTokenError("Token verification is not configured")
+
+    claims = jwt.decode(token, key, algorithms=algorithms, audience=JWT_AUDIENCE)
+    if not claims.get('sub'):
+        raise jwt.InvalidTokenError("Token has no subject")
+    return claims['sub']
+
+
+def require_user(view):
+    """Reject requests without a valid bearer token; sets g.user_id"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return jsonify({"error": "Authentication required"}), 401
+        try:
+            g.user_id = verify_token(token.strip())
+        except (jwt.InvalidTokenError, jwt.PyJWKClientError):
+            return jsonify({"error": "Invalid or expired token"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def private(data):
+    """Per-user JSON that shared caches must not store"""
+    response = jsonify(data)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
+
+@saved_bp.route('/status', methods=['GET', 'POST'])
+@require_user
+def saved_status():
+    """Return {"<id>": saved} for many opportunities in one call
+
+    Pass ?ids=1,2,3 or a JSON body {"ids": [1, 2, 3]}.
+    """
+    body = request.get_json(silent=True) if request.method == 'POST' else None
+    value = body.get('ids', '') if isinstance(body, dict) else request.args.get('ids', '')
+    if isinstance(value, list):
+        value = ','.join(str(item) for item in value)
+    try:
+        ids = parse_ids(value, limit=BATCH_LOOKUP_LIMIT)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    flags = saved_cache.saved_flags(g.user_id, ids)
+    return private({str(opportunity_id): saved for opportunity_id, saved in flags.items()})
+
+
+@saved_bp.route('', methods=['GET'])
+@require_user
+def list_saved():
+    """Return the user's saved opportunities, most recently saved first"""
+    return private(saved_cache.list(g.user_id))
+
+
+@saved_bp.route('/<int:opportunity_id>', methods=['PUT'])
+@require_user
+def save_opportunity(opportunity_id):
+    """Save an opportunity; the JSON body, if any, is stored as its opportunity_data"""
+    saved_cache.save(g.user_id, opportunity_id, request.get_json(silent=True))
+    return private({"opportunity_id": opportunity_id, "saved": True})
+
+
+@saved_bp.route('/<int:opportunity_id>', methods=['DELETE'])
+@require_user
+def unsave_opportunity(opportunity_id):
+    """Remove a saved opportunity (removing one that is not saved is not an error)"""
+    saved_cache.unsave(g.user_id, opportunity_id)
+    return private({"opportunity_id": opportunity_id, "saved": False})
@@ -0,0 +1,245 @@
+"""Storage and caching of the opportunities users have saved
+
+A store keeps (user_id, opportunity_id, opportunity_data, saved_at) rows,
+the shape of the Supabase saved_opportunities table. SQLiteSavedStore is a
+local stand-in for development and tests; SupabaseSavedStore talks to the
+table through PostgREST. SavedCache sits in front of either and keeps each
+user's saved ids as a set, so checking a whole feed of cards is one set
+lookup per card; saves and unsaves made through it update the set, and
+entries also expire after ttl seconds to pick up changes made elsewhere.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from resume_cache import DATA_DIR, create_private_file
+
+
+class SavedStore:
+    """Interface of saved-opportunity stores"""
+
+    def saved_ids(self, user_id):
+        """Return the set of opportunity ids user_id has saved"""
+        raise NotImplementedError
+
+    def list(self, user_id):
+        """Return the user's saved rows, most recently saved first"""
+        raise NotImplementedError
+
+    def save(self, user_id, opportunity_id, opportunity_data=None):
+        """Save an opportunity for a user (saving twice keeps one row)"""
+        raise NotImplementedError
+
+    def unsave(self, user_id, opportunity_id):
+        """Remove a saved opportunity; returns False if it was not saved"""
+        raise NotImplementedError
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SQLiteSavedStore(SavedStore):
+    """saved_opportunities in a local SQLite file"""
+
+    def __init__(self, db_path):
+        self._lock = threading.Lock()
+        create_private_file(db_path)
+        self._db = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS saved_opportunities ("
+            "user_id TEXT NOT NULL, opportunity_id INTEGER NOT NULL, "
+            "opportunity_data TEXT, saved_at TEXT NOT NULL, "
+            "PRIMARY KEY (user_id, opportunity_id))"
+        )
+        self._db.commit()
+
+    def saved_ids(self, user_id):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT opportunity_id FROM saved_opportunities WHERE user_id = ?", (user_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def list(self, user_id):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT opportunity_id, opportunity_data, saved_at FROM saved_opportunities "
+                "WHERE user_id = ? ORDER BY saved_at DESC", (user_id,)
+            ).fetchall()
+        return [
+            {
+                "user_id": user_id,
+                "opportunity_id": opportunity_id,
+                "opportunity_data": json.loads(data) if data else None,
+                "saved_at": saved_at
+            }
+            for opportunity_id, data, saved_at in rows
+        ]
+
+    def save(self, user_id, opportunity_id, opportunity_data=None):
+        data = json.dumps(opportunity_data) if opportunity_data is not None else None
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO saved_opportunities (user_id, opportunity_id, opportunity_data, saved_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (user_id, opportunity_id) DO UPDATE SET "
+                "opportunity_data = COALESCE(excluded.opportunity_data, opportunity_data)",
+                (user_id, opportunity_id, data, _now())
+            )
+            self._db.commit()
+
+    def unsave(self, user_id, opportunity_id):
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM saved_opportunities WHERE user_id = ? AND opportunity_id = ?",
+                (user_id, opportunity_id)
+            )
+            self._db.commit()
+        return cursor.rowcount > 0
+
+
+class SupabaseSavedStore(SavedStore):
+    """saved_opportunities in Supabase, through its PostgREST API
+
+    Uses the service role key, so the backend must only pass user ids taken
+    from verified tokens.
+    """
+
+    def __init__(self, url, service_key, table='saved_opportunities', timeout=10):
+        self.endpoint = f"{url.rstrip('/')}/rest/v1/{table}"
+        self.service_key = service_key
+        self.timeout = timeout
+
+    def _request(self, method, query, body=None, prefer=None):
+        headers = {
+            'apikey': self.service_key,
+            'Authorization': f'Bearer {self.service_key}',
+            'Content-Type': 'application/json'
+        }
+        if prefer:
+            headers['Prefer'] = prefer
+        request = urllib.request.Request(
+            f"{self.endpoint}?{urllib.parse.urlencode(query)}",
+            data=json.dumps(body).encode('utf-8') if body is not None else None,
+            headers=headers,
+            method=method
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            payload = response.read()
+        return json.loads(payload) if payload else []
+
+    def saved_ids(self, user_id):
+        rows = self._request('GET', {'select': 'opportunity_id', 'user_id': f'eq.{user_id}'})
+        return {int(row['opportunity_id']) for row in rows}
+
+    def list(self, user_id):
+        return self._request('GET', {
+            'select': '*', 'user_id': f'eq.{user_id}', 'order': 'saved_at.desc'
+        })
+
+    def save(self, user_id, opportunity_id, opportunity_data=None):
+        self._request(
+            'POST', {'on_conflict': 'user_id,opportunity_id'},
+            [{
+                'user_id': user_id,
+                'opportunity_id': opportunity_id,
+                'opportunity_data': opportunity_data,
+                'saved_at': _now()
+            }],
+            prefer='resolution=merge-duplicates,return=minimal'
+        )
+
+    def unsave(self, user_id, opportunity_id):
+        rows = self._request(
+            'DELETE', {'user_id': f'eq.{user_id}', 'opportunity_id': f'eq.{opportunity_id}'},
+            prefer='return=representation'
+        )
+        return bool(rows)
+
+
+class SavedCache:
+    """Per-user cache of saved id sets in front of a SavedStore"""
+
+    def __init__(self, store, max_users=1024, ttl=300):
+        self.store = store
+        self.max_users = max_users
+        self.ttl = ttl
+        # user_id -> (generation, loaded_at, frozenset of ids or None once invalidated)
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def saved_ids(self, user_id):
+        """Return the user's saved ids, loading them from the store at most once per ttl"""
+        with self._lock:
+            generation, loaded_at, ids = self._users.get(user_id, (0, 0.0, None))
+            if ids is not None and time.time() - loaded_at < self.ttl:
+                self._users.move_to_end(user_id)
+                self.counters["hits"] += 1
+                return ids
+            self.counters["misses"] += 1
+
+        loaded_at = time.time()
+        ids = frozenset(self.store.saved_ids(user_id))
+        with self._lock:
+            # A save or unsave while loading moved the generation on; do not cache stale ids
+            if self._users.get(user_id, (0,))[0] == generation:
+                self._users[user_id] = (generation, loaded_at, ids)
+                self._users.move_to_end(user_id)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+        return ids
+
+    def saved_flags(self, user_id, opportunity_ids):
+        """Return {opportunity_id: saved} for each requested id"""
+        saved = self.saved_ids(user_id)
+        return {opportunity_id: opportunity_id in saved for opportunity_id in opportunity_ids}
+
+    def list(self, user_id):
+        return self.store.list(user_id)
+
+    def save(self, user_id, opportunity_id, opportunity_data=None):
+        self.store.save(user_id, opportunity_id, opportunity_data)
+        self.invalidate(user_id)
+
+    def unsave(self, user_id, opportunity_id):
+        removed = self.store.unsave(user_id, opportunity_id)
+        self.invalidate(user_id)
+        return removed
+
+    def invalidate(self, user_id):
+        """Forget a user's cached ids"""
+        with self._lock:
+            generation = self._users.pop(user_id, (0,))[0]
+            self._users[user_id] = (generation + 1, 0.0, None)
+            self.counters["invalidations"] += 1
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "users": len(self._users)}
+
+
+def saved_store_from_env():
+    """Create the SavedStore selected by SAVED_STORE ('sqlite' or 'supabase')
+
+    Without SAVED_STORE, the Supabase table is used whenever SUPABASE_URL is
+    set, so the backend sees the same saves as the frontend; SQLite is for
+    local development without a Supabase project.
+    """
+    backend = os.getenv('SAVED_STORE') or ('supabase' if os.getenv('SUPABASE_URL') else 'sqlite')
+    if backend == 'supabase':
+        service_key = os.getenv('SUPABASE_SERVICE_KEY')
+        if not service_key:
+            raise ValueError("The supabase saved store needs SUPABASE_SERVICE_KEY (or set SAVED_STORE=sqlite)")
+        return SupabaseSavedStore(os.environ['SUPABASE_URL'], service_key)
+    if backend == 'sqlite':
+        return SQLiteSavedStore(os.getenv('SAVED_DB') or os.path.join(DATA_DIR, 'saved_opportunities.sqlite'))
+    raise ValueError(f"Unknown SAVED_STORE: {backend}")
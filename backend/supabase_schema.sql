@@ -0,0 +1,13 @@
+-- Opportunities saved by each user; the backend's SupabaseSavedStore upserts
+-- on (user_id, opportunity_id), so that pair must be unique
+create table if not exists saved_opportunities (
+  id bigint generated always as identity primary key,
+  user_id uuid not null references auth.users (id) on delete cascade,
+  opportunity_id bigint not null,
+  opportunity_data jsonb,
+  saved_at timestamptz not null default now(),
+  unique (user_id, opportunity_id)
+);
+
+create index if not exists saved_opportunities_user_saved_at
+  on saved_opportunities (user_id, saved_at desc);
@@ -0,0 +1,98 @@
+"""Copy the opportunities package into the serverless function
+
+Usage:
+    python sync_serverless.py [--check]
+
+The Vercel function in frontend/api/python is built from frontend/ alone, so
+it cannot import anything from backend/ once deployed. It gets its own copy
+of the modules it uses instead, next to app.py: the package's __init__ and
+serverless adapter and every module they import at load time (not
+flask_api, or semantic, which the package imports on first use). Run this
+after changing the package; --check only reports whether the copy is out of
+date (exit status 1). test_sync_serverless runs the check, and so does the
+root vercel.json build before a deploy.
+"""
+import argparse
+import ast
+import filecmp
+import os
+import shutil
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.join(BACKEND_DIR, 'opportunities')
+SERVERLESS_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'frontend', 'api', 'python', 'opportunities')
+
+# Modules the function imports itself (frontend/api/python/app.py)
+ENTRY_MODULES = ('__init__', 'serverless')
+
+
+def imported_modules(path):
+    """Package modules imported by the top-level statements of a module"""
+    with open(path, encoding='utf-8') as file:
+        tree = ast.parse(file.read(), path)
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.level == 1:
+            if node.module:
+                names.add(node.module.split('.')[0])
+            else:
+                names.update(alias.name for alias in node.names)
+    return names
+
+
+def required_modules(source=PACKAGE_DIR, entries=ENTRY_MODULES):
+    """File names of the entry modules and everything they import, transitively"""
+    required, pending = set(), list(entries)
+    while pending:
+        name = pending.pop()
+        path = os.path.join(source, f'{name}.py')
+        if name in required or not os.path.exists(path):
+            continue
+        required.add(name)
+        pending.extend(imported_modules(path))
+    return {f'{name}.py' for name in required}
+
+
+def stale_modules(source=PACKAGE_DIR, target=SERVERLESS_DIR):
+    """Modules missing from target, differing from source, or no longer needed there"""
+    required = required_modules(source)
+    present = {name for name in os.listdir(target) if name.endswith('.py')} if os.path.isdir(target) else set()
+    return sorted(
+        name for name in required | present
+        if name not in required or name not in present
+        or not filecmp.cmp(os.path.join(source, name), os.path.join(target, name), shallow=False)
+    )
+
+
+def sync(source=PACKAGE_DIR, target=SERVERLESS_DIR):
+    """Make target an exact copy of the required modules; returns the modules changed"""
+    required = required_modules(source)
+    changed = stale_modules(source, target)
+    os.makedirs(target, exist_ok=True)
+    for name in changed:
+        if name in required:
+            shutil.copyfile(os.path.join(source, name), os.path.join(target, name))
+        else:
+            os.remove(os.path.join(target, name))
+    return changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Copy backend/opportunities into the serverless function")
+    parser.add_argument('--check', action='store_true', help="only report whether the copy is out of date")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        stale = stale_modules()
+        for name in stale:
+            print(f"Out of date: {name} (run python backend/sync_serverless.py)")
+        return 1 if stale else 0
+
+    for name in sync():
+        print(f"Updated: {name}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Crawl the fixture postings through the local fixture server
+
+Run from backend/: python -m unittest test_phd_scraper
+"""
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import phd_scraper
+from opportunities import QueryEngine
+from phd_scraper import FIXTURES_DIR, ScraperState, content_hash, crawl, parse_page, serve_fixtures
+
+FIXTURE_IDS = [101, 102, 103]
+
+
+class FixtureCrawlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='scraper-test-')
+        self.pages = os.path.join(self.directory, 'postings')
+        shutil.copytree(FIXTURES_DIR, self.pages)
+        self.server = serve_fixtures(self.pages, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.seed = f"http://127.0.0.1:{self.server.server_address[1]}/index.html"
+        self.state = ScraperState(os.path.join(self.directory, 'state.sqlite'))
+        self.engine = QueryEngine([], hide_expired=False)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.state.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def crawl(self, concurrency=4):
+        return asyncio.run(asyncio.wait_for(
+            crawl([self.seed], engine=self.engine, state=self.state, concurrency=concurrency),
+            timeout=30
+        ))
+
+    def test_crawl_then_not_modified_then_unchanged(self):
+        stats = self.crawl()
+        self.assertEqual(stats['fetched'], 4)
+        self.assertEqual(stats['updated'], 3)
+        self.assertEqual(stats['failed'], 0)
+        self.assertEqual(sorted(record['id'] for record in self.state.records()), FIXTURE_IDS)
+        self.assertEqual(self.engine.get(101)['university'], "University of Cambridge")
+        version = self.engine.store.version
+
+        # Nothing changed on the server: every page answers 304
+        stats = self.crawl()
+        self.assertEqual(stats['not_modified'], 4)
+        self.assertEqual(stats['fetched'], 0)
+        self.assertEqual(stats['unchanged'], 3)
+        self.assertEqual(stats['updated'], 0)
+        self.assertEqual(self.engine.store.version, version)
+
+        # A page whose bytes change but whose posting does not is fetched, not re-indexed
+        with open(os.path.join(self.pages, 'posting-101.html'), 'a') as page:
+            page.write('<!-- layout change -->\n')
+        stats = self.crawl()
+        self.assertEqual(stats['fetched'], 1)
+        self.assertEqual(stats['not_modified'], 3)
+        self.assertEqual(stats['unchanged'], 3)
+        self.assertEqual(stats['updated'], 0)
+        self.assertEqual(self.engine.store.version, version)
+
+    def test_processing_error_is_counted_and_crawl_finishes(self):
+        def failing_parse_page(url, html):
+            if url.endswith('posting-102.html'):
+                raise AttributeError("broken page")
+            return parse_page(url, html)
+
+        original, phd_scraper.parse_page = phd_scraper.parse_page, failing_parse_page
+        try:
+            # One worker: if the error ended it, the queue would never drain
+            stats = self.crawl(concurrency=1)
+        finally:
+            phd_scraper.parse_page = original
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['updated'], 2)
+
+    def test_list_valued_organization(self):
+        posting = {
+            "@type": "JobPosting",
+            "identifier": "7",
+            "title": "Robot Learning",
+            "hiringOrganization": [{"name": "ETH Zurich", "department": "D-INFK"}],
+            "jobLocation": [{"address": [{"addressLocality": "Zurich"}]}],
+            "applicationContact": ["phd@example.org"],
+        }
+        html = f'<script type="application/ld+json">{json.dumps(posting)}</script>'
+        records, _ = parse_page('http://127.0.0.1/posting.html', html)
+        self.assertEqual(records[0]['university'], "ETH Zurich")
+        self.assertEqual(records[0]['department'], "D-INFK")
+        self.assertEqual(records[0]['location'], "Zurich")
+        self.assertEqual(records[0]['contact'], "phd@example.org")
+
+    def test_content_hash_ignores_key_order(self):
+        record = {"id": 7, "title": "Robotik", "tags": ["ML"], "location": "Zürich"}
+        self.assertEqual(content_hash(record), content_hash(dict(reversed(list(record.items())))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+"""Keep the serverless function's copy of the opportunities package current
+
+Run from backend/: python -m unittest test_sync_serverless
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from sync_serverless import PACKAGE_DIR, required_modules, stale_modules, sync
+
+
+class SyncServerlessTest(unittest.TestCase):
+
+    def test_copy_is_current(self):
+        self.assertEqual(stale_modules(), [], "run python sync_serverless.py and commit the result")
+
+    def test_sync_copies_only_required_modules(self):
+        target = tempfile.mkdtemp(prefix='serverless-copy-')
+        try:
+            with open(os.path.join(target, 'flask_api.py'), 'w') as file:
+                file.write('# no longer needed\n')
+            sync(PACKAGE_DIR, target)
+            copied = {name for name in os.listdir(target) if name.endswith('.py')}
+            self.assertEqual(copied, required_modules())
+            self.assertIn('serverless.py', copied)
+            self.assertNotIn('flask_api.py', copied)
+            self.assertNotIn('semantic.py', copied)
+            self.assertEqual(stale_modules(PACKAGE_DIR, target), [])
+        finally:
+            shutil.rmtree(target, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
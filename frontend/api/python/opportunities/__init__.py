@@ -0,0 +1,81 @@
+"""Shared PhD opportunity data model, indexed query engine and serializers
+
+Both the Flask backend (flask_api) and the serverless functions (serverless)
+are thin adapters around one QueryEngine, so search semantics, caching and
+response shapes stay the same in every deployment. The semantic index
+(SemanticIndex, build_semantic_index, load_semantic_index) is imported on
+first use, so the serverless function, which has no index, ships without it.
+"""
+import os
+
+from .data import SAMPLE_OPPORTUNITIES
+from .dates import DateIndex, parse_day
+from .engine import Page, QueryEngine
+from .facets import FACET_FIELDS, FacetIndex
+from .index import OpportunityIndex, tokenize
+from .matching import MatcherNotReady, OpportunityMatcher, SpacyVectorizer, TfidfVectorizer
+from .models import FIELDS, normalize_opportunity
+from .serializer import dumps, envelope, project
+from .store import OpportunityStore, parse_ids
+from .suggest import Suggester, SuggestionIndex
+
+
+def create_engine(records=None, make_vectorizer=None, get_nlp=None):
+    """Create a QueryEngine over records (the sample data by default), configured from the environment
+
+    get_nlp returns a loaded spaCy pipeline the semantic index may share.
+    """
+    max_features = int(os.getenv('MATCH_MAX_FEATURES', '4096'))
+    semantic_index = None
+    if os.getenv('SEMANTIC_INDEX_DIR'):
+        from .semantic import load_semantic_index
+        semantic_index = load_semantic_index(
+            os.getenv('SEMANTIC_INDEX_DIR'),
+            nprobe=int(os.getenv('SEMANTIC_NPROBE', '8')),
+            get_nlp=get_nlp
+        )
+    return QueryEngine(
+        SAMPLE_OPPORTUNITIES if records is None else records,
+        cache_size=int(os.getenv('RESPONSE_CACHE_SIZE', '1024')),
+        cache_ttl=int(os.getenv('RESPONSE_CACHE_TTL', '300')),
+        make_vectorizer=make_vectorizer or (lambda: TfidfVectorizer(max_features)),
+        semantic_index=semantic_index,
+        hide_expired=os.getenv('HIDE_EXPIRED', '1') == '1'
+    )
+
+
+def __getattr__(name):
+    if name in ('SemanticIndex', 'build_semantic_index', 'load_semantic_index'):
+        from . import semantic
+        return getattr(semantic, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    'DateIndex',
+    'FACET_FIELDS',
+    'FIELDS',
+    'FacetIndex',
+    'MatcherNotReady',
+    'OpportunityIndex',
+    'OpportunityMatcher',
+    'OpportunityStore',
+    'Page',
+    'QueryEngine',
+    'SAMPLE_OPPORTUNITIES',
+    'SemanticIndex',
+    'SpacyVectorizer',
+    'Suggester',
+    'SuggestionIndex',
+    'TfidfVectorizer',
+    'build_semantic_index',
+    'create_engine',
+    'dumps',
+    'envelope',
+    'load_semantic_index',
+    'normalize_opportunity',
+    'parse_day',
+    'parse_ids',
+    'project',
+    'tokenize',
+]
@@ -0,0 +1,90 @@
+"""Sample PhD opportunities served until scraped data is loaded"""
+
+SAMPLE_OPPORTUNITIES = [
+    {
+        "id": 1,
+        "title": "Machine Learning for Climate Change Prediction",
+        "university": "Stanford University",
+        "department": "Computer Science",
+        "location": "Stanford, CA",
+        "description": "Research on using advanced machine learning techniques for climate change prediction and analysis.",
+        "requirements": [
+            "MS in Computer Science or related field",
+            "Experience with machine learning and environmental data analysis"
+        ],
+        "deadline": "2027-12-15",
+        "posted_date": "2025-06-15",
+        "funding": "Fully funded",
+        "stipend": "$40,000 per year",
+        "contact": "prof.smith@stanford.edu",
+        "advisor": "Dr. Jane Smith",
+        "tags": ["Machine Learning", "Climate Science", "AI"]
+    },
+    {
+        "id": 2,
+        "title": "Quantum Computing Algorithms",
+        "university": "MIT",
+        "department": "Physics",
+        "location": "Cambridge, MA",
+        "description": "Developing novel quantum algorithms for optimization problems in various scientific domains.",
+        "requirements": [
+            "MS in Physics, Computer Science, or Mathematics",
+            "Strong background in quantum mechanics"
+        ],
+        "deadline": "2027-11-30",
+        "posted_date": "2025-05-20",
+        "funding": "Fully funded with stipend",
+        "stipend": "$45,000 per year",
+        "contact": "quantum.research@mit.edu",
+        "advisor": "Dr. Robert Chen",
+        "tags": ["Quantum Computing", "Algorithms", "Optimization"]
+    },
+    {
+        "id": 3,
+        "title": "AI-Driven Drug Discovery",
+        "university": "Harvard University",
+        "department": "Biomedical Engineering",
+        "location": "Cambridge, MA",
+        "description": "Using artificial intelligence to accelerate drug discovery and development processes.",
+        "requirements": [
+            "MS in Biomedical Engineering, Computer Science, or related field",
+            "Experience with AI and molecular biology"
+        ],
+        "deadline": "2028-01-10",
+        "funding": "Partial funding available",
+        "contact": "bio.research@harvard.edu",
+        "tags": ["AI", "Drug Discovery", "Computational Biology"]
+    },
+    {
+        "id": 4,
+        "title": "Natural Language Processing for Healthcare",
+        "university": "University of California, Berkeley",
+        "department": "Computer Science",
+        "location": "Berkeley, CA",
+        "description": "Developing NLP models to improve healthcare delivery and patient outcomes through automated medical text analysis.",
+        "requirements": [
+            "MS in Computer Science or related field",
+            "Experience with NLP and healthcare data"
+        ],
+        "deadline": "2027-10-31",
+        "funding": "Fully funded",
+        "contact": "nlp.healthcare@berkeley.edu",
+        "tags": ["NLP", "Healthcare", "AI"]
+    },
+    {
+        "id": 5,
+        "title": "Renewable Energy Systems Optimization",
+        "university": "ETH Zurich",
+        "department": "Electrical Engineering",
+        "location": "Zurich, Switzerland",
+        "description": "Optimization of renewable energy systems for improved efficiency and grid integration.",
+        "requirements": [
+            "MS in Electrical Engineering, Energy Systems, or related field",
+            "Experience with energy system modeling"
+        ],
+        "deadline": "2027-11-15",
+        "funding": "Fully funded with stipend",
+        "contact": "energy.phd@ethz.ch",
+        "tags": ["Renewable Energy", "Optimization", "Energy Systems"]
+    }
+]
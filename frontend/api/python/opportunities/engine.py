@@ -0,0 +1,367 @@
+"""The opportunity query engine shared by the Flask and serverless APIs
+
+One QueryEngine owns the store, the search index and the response cache, and
+interprets the same query parameters for every runtime:
+
+- query: free text over title, university, department, description and tags
+- keywords: free text over title and description
+- university, department, funding: per-field filters; tags: comma-separated
+  tags, all of which must match. Filters are resolved on facet bitmaps
+- deadline_after, deadline_before, posted_after, posted_before: inclusive
+  date ranges (YYYY-MM-DD), answered from sorted day-number arrays
+- sort: 'relevance' (default), 'deadline', 'posted_date', or '-' + a date
+  field for latest first; undated records come last
+- facets: "1" (every facet) or a list of facets; adds per-value result counts
+- limit, cursor: pagination; fields: projection
+- mode: 'keyword' (default) ranks query with the inverted index, 'semantic'
+  with the nearest-neighbour index, when one is loaded
+
+With hide_expired, records whose deadline has passed are left out of every
+listing, match and suggestion (not of lookups by id). Unfiltered listings
+(closing_soon() among them) are read one page at a time from the store order
+or a sorted date array, skipping expired records on the way.
+
+match() ranks every opportunity against a parsed resume (or plain text);
+suggest() completes search-box prefixes.
+"""
+from bisect import bisect_right
+
+from .dates import (
+    UNDATED, DateIndex, add_days, format_day, parse_day_param, parse_days, parse_sort, start_of_today, today
+)
+from .facets import FacetIndex, parse_facet_fields, parse_tags
+from .index import OpportunityIndex
+from .matching import OpportunityMatcher, TfidfVectorizer, parse_match_limit, resume_text
+from .models import normalize_opportunity
+from .pagination import decode_cursor, encode_cursor, paginate, parse_limit
+from .response_cache import ResponseCache
+from .serializer import parse_fields, project
+from .store import OpportunityStore
+from .suggest import Suggester, parse_suggest_limit
+
+QUERY_FIELDS = ('title', 'university', 'department', 'description', 'tags')
+KEYWORD_FIELDS = ('title', 'description')
+FILTER_FIELDS = ('university', 'department', 'funding')
+
+# Date field, lower and upper bound parameters
+DATE_FILTERS = (
+    ('deadline', 'deadline_after', 'deadline_before'),
+    ('posted_date', 'posted_after', 'posted_before'),
+)
+
+SEARCH_MODES = ('keyword', 'semantic')
+
+# Maximum number of ids accepted by a batch lookup
+BATCH_LOOKUP_LIMIT = 500
+
+# Nearest neighbours fetched for a semantic query, before filters and paging
+SEMANTIC_CANDIDATES = 1000
+
+
+class Page:
+    """One page of query results"""
+
+    def __init__(self, items, total, next_cursor, facets=None):
+        self.items = items
+        self.total = total
+        self.next_cursor = next_cursor
+        # {field: [{"value", "count"}]} when facet counts were requested
+        self.facets = facets
+
+
+class QueryEngine:
+    """Indexed, cached queries over one opportunity store"""
+
+    def __init__(self, records=(), cache_size=1024, cache_ttl=300, make_vectorizer=TfidfVectorizer,
+                 semantic_index=None, hide_expired=False):
+        self.store = OpportunityStore(normalize_opportunity(record) for record in records)
+        self.index = self.store.attach(OpportunityIndex())
+        self.facets = self.store.attach(FacetIndex())
+        self.dates = self.store.attach(DateIndex())
+        self.hide_expired = hide_expired
+        # (store version, day, set and bitmap of the records past their deadline)
+        self._expired = (None, None, frozenset(), 0)
+        self.cache = ResponseCache(max_entries=cache_size, ttl=cache_ttl)
+        self.matcher = OpportunityMatcher(self.store, make_vectorizer)
+        self.suggester = Suggester(self.store, version=lambda: self.version, records=self.live_records)
+        self.semantic_index = semantic_index
+
+    @property
+    def version(self):
+        """Dataset version; with expired records hidden it also moves on every day"""
+        if self.hide_expired:
+            return self.store.version, today()
+        return self.store.version
+
+    @property
+    def modified_at(self):
+        if self.hide_expired:
+            return max(self.store.modified_at, start_of_today())
+        return self.store.modified_at
+
+    def upsert(self, record):
+        """Add or replace one record"""
+        self.store.upsert(normalize_opportunity(record))
+
+    def upsert_many(self, records):
+        """Add or replace several records"""
+        self.store.upsert_many(normalize_opportunity(record) for record in records)
+
+    def delete(self, opportunity_id):
+        return self.store.delete(opportunity_id)
+
+    def get(self, opportunity_id):
+        return self.store.get(opportunity_id)
+
+    def get_many(self, opportunity_ids):
+        return self.store.get_many(opportunity_ids)
+
+    def search(self, params):
+        """Run a query and return one Page; raises ValueError for bad parameters"""
+        limit = parse_limit(params.get('limit'))
+        fields = parse_fields(params.get('fields'))
+        facet_fields = parse_facet_fields(params.get('facets'))
+        self.search_mode(params)
+        page = self.walk_page(params, limit)
+        if page is None:
+            keys, ids = self.sorted_ids(params)
+            page_ids, next_cursor = paginate(keys, ids, params.get('cursor'), limit)
+            total = len(ids)
+        else:
+            ids = None
+            page_ids, next_cursor, total = page
+        items = [project(record, fields) for record in self.store.get_many(page_ids)]
+
+        facets = None
+        if facet_fields:
+            facets = self.facets.counts(self.result_bitmap(params, ids), facet_fields)
+        return Page(items, total, next_cursor, facets)
+
+    def closing_soon(self, params):
+        """Return the Page of opportunities whose deadline is within params['days'] (default 30), soonest first"""
+        days = parse_days(params.get('days'))
+        start = today()
+        return self.search({
+            **params,
+            'deadline_after': format_day(start),
+            'deadline_before': format_day(add_days(start, days)),
+            'sort': 'deadline',
+        })
+
+    def match(self, params):
+        """Return the opportunities best matching params['resume'] (or params['text']), with a match_score
+
+        Raises ValueError for bad parameters and MatcherNotReady until the
+        opportunity vectors are first built.
+        """
+        resume = params.get('resume') or params.get('text')
+        if not resume or not isinstance(resume, (dict, str)):
+            raise ValueError("Provide a parsed resume or resume text")
+        limit = parse_match_limit(params.get('limit'))
+        fields = parse_fields(params.get('fields'))
+
+        matches = self.matcher.match(resume_text(resume), limit, exclude=self.expired_ids())
+        results = []
+        for doc_id, score in matches:
+            # The vectors may be a build behind the store; skip deleted records
+            record = self.store.get(doc_id)
+            if record is not None:
+                results.append({**project(record, fields), 'match_score': round(score, 4)})
+        return results
+
+    def suggest(self, params):
+        """Return suggestions completing params['prefix'], most popular first
+
+        fuzzy=0 turns off typo correction. Raises ValueError for bad parameters.
+        """
+        limit = parse_suggest_limit(params.get('limit'))
+        fuzzy = str(params.get('fuzzy', '1')).lower() not in ('0', 'false')
+        return self.suggester.suggest(params.get('prefix') or '', limit, fuzzy)
+
+    def search_mode(self, params):
+        """Return the search mode of params; raises ValueError if it is unknown or unavailable"""
+        mode = params.get('mode') or 'keyword'
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(SEARCH_MODES)}")
+        if mode == 'semantic' and self.semantic_index is None:
+            raise ValueError("Semantic search is not available")
+        return mode
+
+    def walk_page(self, params, limit):
+        """(page ids, next cursor, total) of a listing read in result order, or None if filters apply
+
+        A listing without a text query or filters (other than a date range on
+        the field it is sorted by) is read straight from the store order or
+        the sorted date array, starting at the cursor and skipping expired
+        records until the page is full, and its total is counted rather than
+        listed: O(log N + limit), plus the expired records passed over.
+        """
+        if params.get('query') or params.get('keywords'):
+            return None
+        if any(params.get(name) for name in FILTER_FIELDS) or parse_tags(params.get('tags')):
+            return None
+        sort = parse_sort(params.get('sort'))
+        bounds = self.date_bounds(params)
+        if set(bounds) - {sort[0] if sort else None}:
+            return None
+
+        expired = self.expired_set()
+        cursor = params.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+        if sort is None:
+            positions, ids = self.store.ordered()
+            try:
+                begin = 0 if after is None else bisect_right(positions, after)
+            except TypeError:
+                raise ValueError("Invalid cursor")
+            entries = ((positions[i], ids[i]) for i in range(begin, len(ids)))
+            total = len(ids) - len(expired)
+        else:
+            field, descending = sort
+            start, end = bounds.get(field, (None, UNDATED))
+            if field == 'deadline' and expired:
+                # Expired records are exactly those before today
+                start = today() if start is None else max(start, today())
+                expired = ()
+            elif expired and field in bounds:
+                # Counting the expired records inside the range would mean listing them
+                return None
+            entries = self.dates.walk(field, descending, start, end, after)
+            total = self.dates.count(field, start, end) - len(expired)
+
+        page = []
+        for key, doc_id in entries:
+            if doc_id in expired:
+                continue
+            if len(page) == limit:
+                return [doc_id for _, doc_id in page], encode_cursor(page[-1][0]), total
+            page.append((key, doc_id))
+        return [doc_id for _, doc_id in page], None, total
+
+    def sorted_ids(self, params):
+        """Return (sort keys, ids) of every match, in result order"""
+        mode = self.search_mode(params)
+        sort = parse_sort(params.get('sort'))
+
+        bitmap = self.filter_bitmap(params)
+        filtered = None if bitmap is None else self.facets.ids_of(bitmap)
+        candidates = None if filtered is None else set(filtered)
+
+        ranked = None
+        for name, fields in (('query', QUERY_FIELDS), ('keywords', KEYWORD_FIELDS)):
+            text = params.get(name)
+            if text:
+                if ranked is not None:
+                    candidates = {doc_id for doc_id, _ in ranked}
+                if mode == 'semantic' and name == 'query':
+                    ranked = self.semantic_search(text, candidates)
+                else:
+                    ranked = self.index.search(text, fields=fields, candidates=candidates)
+
+        if sort:
+            ids = filtered if ranked is None else [doc_id for doc_id, _ in ranked]
+            return self.dates.ordered(*sort, ids=ids)
+
+        if ranked is None:
+            if filtered is None:
+                return self.store.ordered()
+            # Bitmap order is insertion order already
+            positions = self.store.positions
+            return [positions[doc_id] for doc_id in filtered], filtered
+
+        positions = self.index.positions
+        keys = [(-score, positions[doc_id]) for doc_id, score in ranked]
+        return keys, [doc_id for doc_id, _ in ranked]
+
+    def date_bounds(self, params):
+        """{field: (first day, last day)} of the date filters in params; a missing bound is None"""
+        bounds = {}
+        for field, after, before in DATE_FILTERS:
+            start = parse_day_param(params.get(after), after)
+            end = parse_day_param(params.get(before), before)
+            if start is not None or end is not None:
+                bounds[field] = (start, end)
+        return bounds
+
+    def expired_ids(self):
+        """Ids of the records whose deadline has passed; none when expired records are shown"""
+        if not self.hide_expired:
+            return []
+        _, ids = self.dates.range('deadline', end=today() - 1)
+        return ids
+
+    def _expired_state(self):
+        """(set, bitmap) of the expired records, recomputed when the data or the day changes"""
+        version, day = self.store.version, today()
+        if self._expired[:2] != (version, day):
+            ids = self.expired_ids()
+            self._expired = (version, day, frozenset(ids), self.facets.bitmap_of(ids))
+        return self._expired[2:]
+
+    def expired_set(self):
+        """Set of the ids of records whose deadline has passed; empty when expired records are shown"""
+        if not self.hide_expired:
+            return frozenset()
+        return self._expired_state()[0]
+
+    def expired_bitmap(self):
+        """Bitmap of the records whose deadline has passed; 0 when expired records are shown"""
+        if not self.hide_expired:
+            return 0
+        return self._expired_state()[1]
+
+    def live_records(self):
+        """Every record that listings may show, in insertion order"""
+        expired = self.expired_set()
+        if not expired:
+            return self.store.all()
+        return [record for record in self.store if record['id'] not in expired]
+
+    def filter_bitmap(self, params):
+        """Bitmap of the records passing every field, tag and date filter and not expired
+
+        Returns None when nothing is filtered out.
+        """
+        facets = self.facets
+        filters = [(field, params.get(field)) for field in FILTER_FIELDS if params.get(field)]
+        filters += [('tags', tag) for tag in parse_tags(params.get('tags'))]
+        bitmaps = [facets.filter(field, value) for field, value in filters]
+        bitmaps += [
+            facets.bitmap_of(self.dates.range(field, start, end)[1])
+            for field, (start, end) in self.date_bounds(params).items()
+        ]
+        expired = self.expired_bitmap()
+        if not bitmaps and not expired:
+            return None
+
+        bitmap = facets.live & ~expired
+        for other in bitmaps:
+            bitmap &= other
+            if not bitmap:
+                break
+        return bitmap
+
+    def result_bitmap(self, params, ids):
+        """Bitmap of a query's results, reusing the filter bitmap when no text query narrowed it"""
+        if params.get('query') or params.get('keywords'):
+            return self.facets.bitmap_of(ids)
+        bitmap = self.filter_bitmap(params)
+        return self.facets.live if bitmap is None else bitmap
+
+    def semantic_search(self, text, candidates=None):
+        """Return [(id, score)] of the nearest neighbours of text that are still in the store"""
+        store = self.store
+        return [
+            (doc_id, score) for doc_id, score in self.semantic_index.search(text, SEMANTIC_CANDIDATES)
+            if doc_id in store and (candidates is None or doc_id in candidates)
+        ]
+
+    def cached(self, key, build):
+        """Return the CachedResponse for key, building it with build() on a miss"""
+        version = self.version
+        entry = self.cache.get(key, version)
+        if entry is None:
+            entry = build()
+            if entry is not None:
+                self.cache.put(key, version, entry)
+        return entry
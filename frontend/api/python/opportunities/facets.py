@@ -0,0 +1,231 @@
+"""Facet bitmaps for opportunity filtering and facet counts
+
+Every record gets a slot (a bit position, in insertion order), and every
+normalized university, department, funding and tag value maps to a Python
+int with the bits of the records carrying it. A filter is the OR of the
+bitmaps of the values it matches, several filters are ANDed, and a facet
+count is the popcount of a value's bitmap ANDed with the result bitmap, so
+no record is looked at or lower-cased per request.
+
+A filter matches a value when each of its tokens starts a token of the value
+("stanford" matches "Stanford University", "full" matches "Fully funded"),
+the same rule the search index uses. The values each filter text matches are
+cached until the set of values changes.
+"""
+import numpy as np
+
+from .index import tokenize
+
+FACET_FIELDS = ('university', 'department', 'funding', 'tags')
+
+# Values returned per facet, most frequent first
+FACET_LIMIT = 20
+
+
+def normalize_value(value):
+    """Facet key for a field value"""
+    return ' '.join(str(value).lower().split())
+
+
+def bitmap_from_slots(slots):
+    """Bitmap with the given bit positions set"""
+    slots = np.asarray(slots, dtype=np.int64)
+    if not len(slots):
+        return 0
+    bits = np.zeros(int(slots.max()) + 1, dtype=bool)
+    bits[slots] = True
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def slots_from_bitmap(bitmap):
+    """Ascending bit positions set in a bitmap"""
+    if not bitmap:
+        return np.zeros(0, dtype=np.int64)
+    data = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(data, bitorder='little'))
+
+
+def parse_facet_fields(value):
+    """Parse the facets parameter: "1"/"true" for every facet or a list ("university,tags"); None for none
+
+    Raises ValueError for unknown facets.
+    """
+    if not value or str(value).lower() in ('0', 'false'):
+        return None
+    if value is True or str(value).lower() in ('1', 'true'):
+        return FACET_FIELDS
+    if isinstance(value, str):
+        value = value.split(',')
+    fields = [field.strip() for field in value if field.strip()]
+    unknown = [field for field in fields if field not in FACET_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown facet: {unknown[0]}; facets are {', '.join(FACET_FIELDS)}")
+    return tuple(fields) or None
+
+
+def parse_tags(value):
+    """Parse a tag filter ("machine learning,nlp") into a list of tags"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(tag).strip() for tag in value if str(tag).strip()]
+
+
+def _values(record, field):
+    value = record.get(field)
+    values = value if isinstance(value, (list, tuple)) else [value]
+    keys = {}
+    for item in values:
+        if item:
+            keys.setdefault(normalize_value(item), str(item).strip())
+    return keys
+
+
+class FacetIndex:
+    """Value -> record bitmap per facet field, kept in sync with a store"""
+
+    def __init__(self, fields=FACET_FIELDS):
+        self.fields = tuple(fields)
+        # field -> normalized value -> bitmap
+        self.bitmaps = {field: {} for field in self.fields}
+        # field -> normalized value -> display form (first seen)
+        self.labels = {field: {} for field in self.fields}
+        # field -> normalized value -> tokens, for filter matching
+        self.tokens = {field: {} for field in self.fields}
+        # field -> filter text -> matching values
+        self._matches = {field: {} for field in self.fields}
+        # doc_id -> slot, slot -> doc_id
+        self.slots = {}
+        self.ids = []
+        self.live = 0
+        # doc_id -> {field: [values]}, so removal only touches its own bitmaps
+        self.doc_values = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add_many(self, records):
+        """Index many records, building each touched bitmap once"""
+        pending = {field: {} for field in self.fields}
+        # Only the last copy of an id repeated in the batch counts; indexing an
+        # earlier one would leave its slots in pending to be ORed back later
+        records = {record['id']: record for record in records}.values()
+        for record in records:
+            doc_id = record['id']
+            if doc_id in self.slots:
+                # Replacements are rare; update them bit by bit
+                self.add(record)
+                continue
+            slot = self._allocate(doc_id)
+            values = {field: _values(record, field) for field in self.fields}
+            self.doc_values[doc_id] = {field: list(keys) for field, keys in values.items()}
+            for field, keys in values.items():
+                for key, label in keys.items():
+                    self._register(field, key, label)
+                    pending[field].setdefault(key, []).append(slot)
+
+        for field, values in pending.items():
+            bitmaps = self.bitmaps[field]
+            for key, slots in values.items():
+                bitmaps[key] = bitmaps.get(key, 0) | bitmap_from_slots(slots)
+        self.live = bitmap_from_slots([self.slots[doc_id] for doc_id in self.slots])
+
+    def add(self, record):
+        """Index a record, replacing any previous version with the same id"""
+        doc_id = record['id']
+        if doc_id in self.slots:
+            self._clear(doc_id)
+            slot = self.slots[doc_id]
+        else:
+            slot = self._allocate(doc_id)
+            self.live |= 1 << slot
+
+        bit = 1 << slot
+        values = {field: _values(record, field) for field in self.fields}
+        self.doc_values[doc_id] = {field: list(keys) for field, keys in values.items()}
+        for field, keys in values.items():
+            bitmaps = self.bitmaps[field]
+            for key, label in keys.items():
+                self._register(field, key, label)
+                bitmaps[key] = bitmaps.get(key, 0) | bit
+
+    def remove(self, doc_id):
+        """Drop a record from every bitmap"""
+        if doc_id not in self.slots:
+            return
+        self._clear(doc_id)
+        slot = self.slots.pop(doc_id)
+        self.ids[slot] = None
+        self.live &= ~(1 << slot)
+
+    def _allocate(self, doc_id):
+        slot = len(self.ids)
+        self.slots[doc_id] = slot
+        self.ids.append(doc_id)
+        return slot
+
+    def _register(self, field, key, label):
+        if key not in self.labels[field]:
+            self.labels[field][key] = label
+            self.tokens[field][key] = tokenize(key)
+            self._matches[field].clear()
+
+    def _clear(self, doc_id):
+        """Unset a record's bits, dropping values no record has any more"""
+        mask = ~(1 << self.slots[doc_id])
+        for field, keys in self.doc_values.pop(doc_id, {}).items():
+            bitmaps = self.bitmaps[field]
+            for key in keys:
+                bitmaps[key] &= mask
+                if not bitmaps[key]:
+                    del bitmaps[key]
+                    del self.labels[field][key]
+                    del self.tokens[field][key]
+                    self._matches[field].clear()
+
+    def matching_values(self, field, text):
+        """Normalized values of field matched by filter text"""
+        tokens = tokenize(text)
+        key = ' '.join(tokens)
+        matches = self._matches[field]
+        if key not in matches:
+            matches[key] = [
+                value for value, value_tokens in self.tokens[field].items()
+                if all(any(term.startswith(token) for term in value_tokens) for token in tokens)
+            ]
+        return matches[key]
+
+    def filter(self, field, text):
+        """Bitmap of the records whose field matches text"""
+        if not tokenize(text):
+            return self.live
+        bitmaps = self.bitmaps[field]
+        bitmap = 0
+        for value in self.matching_values(field, text):
+            bitmap |= bitmaps[value]
+        return bitmap
+
+    def bitmap_of(self, doc_ids):
+        """Bitmap of the given records"""
+        slots = self.slots
+        return bitmap_from_slots([slots[doc_id] for doc_id in doc_ids if doc_id in slots])
+
+    def ids_of(self, bitmap):
+        """Record ids in a bitmap, in insertion order"""
+        ids = self.ids
+        return [ids[slot] for slot in slots_from_bitmap(bitmap & self.live)]
+
+    def counts(self, bitmap, fields=None, limit=FACET_LIMIT):
+        """Facet counts within bitmap: {field: [{"value", "count"}, ...]}, most frequent first"""
+        result = {}
+        for field in fields or self.fields:
+            labels = self.labels[field]
+            counts = []
+            for key, value_bitmap in self.bitmaps[field].items():
+                count = (value_bitmap & bitmap).bit_count()
+                if count:
+                    counts.append((count, key))
+            counts.sort(key=lambda item: (-item[0], item[1]))
+            result[field] = [{"value": labels[key], "count": count} for count, key in counts[:limit]]
+        return result
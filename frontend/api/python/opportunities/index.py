@@ -0,0 +1,175 @@
+"""Inverted index for PhD opportunity search
+
+Records are tokenized once when they are added. A query then only touches
+the posting lists of its own terms instead of lower-casing and scanning
+every record. Each query token matches any indexed term it is a prefix of
+("learn" finds "learning"). Results are ranked with BM25 summed over the
+searched fields.
+"""
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Fields indexed for every record, with their weight in free-text ranking
+DEFAULT_FIELD_WEIGHTS = {
+    'title': 3.0,
+    'university': 1.5,
+    'department': 1.5,
+    'description': 1.0,
+    'funding': 1.0,
+    'tags': 2.0,
+}
+
+
+def tokenize(text):
+    """Split text into lower-case word tokens"""
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(item) for item in text)
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class OpportunityIndex:
+    """Per-field inverted index over opportunity records with BM25 ranking"""
+
+    def __init__(self, field_weights=None, k1=1.2, b=0.75):
+        self.field_weights = dict(field_weights or DEFAULT_FIELD_WEIGHTS)
+        self.k1 = k1
+        self.b = b
+
+        # field -> term -> {doc_id: term frequency}
+        self.postings = {field: {} for field in self.field_weights}
+        # field -> sorted list of terms, for prefix lookups
+        self.vocabulary = {field: [] for field in self.field_weights}
+        # field -> {doc_id: token count}
+        self.lengths = {field: {} for field in self.field_weights}
+        # field -> {doc_id: distinct terms}, so removal only touches its own postings
+        self.doc_terms = {field: {} for field in self.field_weights}
+        self.total_lengths = {field: 0 for field in self.field_weights}
+        # doc_id -> insertion position, used to break ranking ties stably
+        self.positions = {}
+        self._next_position = 0
+
+    @classmethod
+    def build(cls, records, **kwargs):
+        """Create an index containing every record"""
+        index = cls(**kwargs)
+        index.add_many(records)
+        return index
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.positions
+
+    def add_many(self, records):
+        """Index many records, sorting the vocabularies once at the end"""
+        for record in records:
+            self.add(record, _sort_vocabulary=False)
+        for field, postings in self.postings.items():
+            self.vocabulary[field] = sorted(postings)
+
+    def add(self, record, _sort_vocabulary=True):
+        """Index a record, replacing any previous version with the same id"""
+        doc_id = record['id']
+        if doc_id in self.positions:
+            self.remove(doc_id, keep_position=True)
+        else:
+            self.positions[doc_id] = self._next_position
+            self._next_position += 1
+
+        for field in self.field_weights:
+            tokens = tokenize(record.get(field))
+            self.lengths[field][doc_id] = len(tokens)
+            self.total_lengths[field] += len(tokens)
+
+            counts = Counter(tokens)
+            self.doc_terms[field][doc_id] = list(counts)
+
+            postings = self.postings[field]
+            for term, count in counts.items():
+                if term not in postings:
+                    postings[term] = {}
+                    if _sort_vocabulary:
+                        insort(self.vocabulary[field], term)
+                postings[term][doc_id] = count
+
+    def remove(self, doc_id, keep_position=False):
+        """Drop a record from the index"""
+        if doc_id not in self.positions:
+            return
+
+        for field in self.field_weights:
+            postings = self.postings[field]
+            self.total_lengths[field] -= self.lengths[field].pop(doc_id, 0)
+
+            for term in self.doc_terms[field].pop(doc_id, ()):
+                docs = postings[term]
+                del docs[doc_id]
+                if not docs:
+                    del postings[term]
+                    vocabulary = self.vocabulary[field]
+                    del vocabulary[bisect_left(vocabulary, term)]
+
+        if not keep_position:
+            del self.positions[doc_id]
+
+    def expand(self, field, prefix):
+        """Return the indexed terms of field that start with prefix"""
+        vocabulary = self.vocabulary[field]
+        start = bisect_left(vocabulary, prefix)
+        end = bisect_left(vocabulary, prefix + '\uffff', start)
+        return vocabulary[start:end]
+
+    def search(self, query, fields=None, candidates=None):
+        """Rank records containing every query token in at least one of fields
+
+        Returns a list of (doc_id, score) pairs, best first. An empty query
+        returns every candidate in insertion order with a score of 0.
+        """
+        fields = fields or tuple(self.field_weights)
+        tokens = tokenize(query)
+
+        if not tokens:
+            ids = self.positions if candidates is None else candidates
+            return [(doc_id, 0.0) for doc_id in sorted(ids, key=self.positions.__getitem__)]
+
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for field in fields:
+                for term in self.expand(field, token):
+                    for doc_id, score in self._bm25(field, term).items():
+                        token_scores[doc_id] = token_scores.get(doc_id, 0.0) + score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: scores[doc_id] + score for doc_id, score in token_scores.items() if doc_id in scores}
+
+            if candidates is not None:
+                scores = {doc_id: score for doc_id, score in scores.items() if doc_id in candidates}
+            if not scores:
+                return []
+
+        return sorted(scores.items(), key=lambda item: (-item[1], self.positions[item[0]]))
+
+    def _bm25(self, field, term):
+        """BM25 contribution of one term in one field, per record"""
+        docs = self.postings[field][term]
+        count = len(self.positions)
+        idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+        average = (self.total_lengths[field] / count) or 1.0
+        weight = self.field_weights[field]
+        lengths = self.lengths[field]
+
+        return {
+            doc_id: weight * idf * tf * (self.k1 + 1)
+            / (tf + self.k1 * (1 - self.b + self.b * lengths[doc_id] / average))
+            for doc_id, tf in docs.items()
+        }
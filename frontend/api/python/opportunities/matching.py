@@ -0,0 +1,294 @@
+"""Resume-to-opportunity matching with precomputed vectors
+
+Every opportunity is turned into one L2-normalized vector, and matching a
+resume is one matrix-vector product (cosine similarity against every
+opportunity at once) followed by argpartition for the top k, instead of a
+Python loop over pairs.
+
+Vectors are TF-IDF over the opportunity vocabulary by default, kept sparse
+and stored by term (SparseColumns), so memory grows with the number of
+distinct terms per posting rather than the vocabulary size and a resume only
+touches the postings sharing its terms. SpacyVectorizer gives dense spaCy
+document vectors when a model with vectors is loaded.
+
+The vectors are built in a background thread, first when the app starts
+(or on the first match) and again whenever the data changes; matches keep
+using the previous build until the new one is ready, and raise
+MatcherNotReady (a 503 from the APIs) until the first build is done.
+"""
+import math
+import threading
+from collections import Counter
+
+import numpy as np
+
+from .index import tokenize
+
+# Fields of an opportunity that describe what it asks for, with their weight
+MATCH_FIELDS = {
+    'title': 2,
+    'department': 1,
+    'description': 1,
+    'requirements': 1,
+    'tags': 2,
+}
+
+# Sections of a parsed resume (see resume_parser.parse_resume) used for matching
+RESUME_SECTIONS = ('skills', 'qualifications', 'education', 'experience', 'certifications', 'achievements')
+
+DEFAULT_MATCH_LIMIT = 10
+MAX_MATCH_LIMIT = 100
+# Seconds a client is asked to wait while the first vectors are built
+MATCH_RETRY_AFTER = '2'
+
+
+def opportunity_text(record):
+    """Text an opportunity is matched on; weighted fields are repeated"""
+    parts = []
+    for field, weight in MATCH_FIELDS.items():
+        value = record.get(field)
+        if isinstance(value, (list, tuple)):
+            value = ' '.join(str(item) for item in value)
+        if value:
+            parts.extend([str(value)] * weight)
+    return ' '.join(parts)
+
+
+def resume_text(resume):
+    """Flatten a parsed resume into one text"""
+    if isinstance(resume, str):
+        return resume
+    parts = []
+    for section in RESUME_SECTIONS:
+        value = resume.get(section)
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(item) for item in value)
+        elif value:
+            parts.append(str(value))
+    return ' '.join(parts)
+
+
+class TfidfVectorizer:
+    """TF-IDF vectors (sublinear tf, smoothed idf) over a fitted vocabulary"""
+
+    def __init__(self, max_features=4096):
+        self.max_features = max_features
+        self.vocabulary = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+
+    def fit_transform(self, texts):
+        """Learn the vocabulary from texts and return their vectors"""
+        counts = [Counter(tokenize(text)) for text in texts]
+        df = Counter()
+        for count in counts:
+            df.update(count.keys())
+
+        # Terms in every document carry no information; keep the most common of the rest
+        n = len(counts)
+        terms = [term for term, freq in df.most_common() if freq < n or n == 1]
+        if self.max_features:
+            terms = terms[:self.max_features]
+        self.vocabulary = {term: i for i, term in enumerate(sorted(terms))}
+        self.idf = np.array(
+            [math.log((1 + n) / (1 + df[term])) + 1 for term in sorted(terms)],
+            dtype=np.float32
+        )
+
+        vocabulary, idf = self.vocabulary, self.idf
+        rows, columns, values = [], [], []
+        for row, count in enumerate(counts):
+            for term, tf in count.items():
+                column = vocabulary.get(term)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(1 + math.log(tf))
+        rows = np.array(rows, dtype=np.int32)
+        columns = np.array(columns, dtype=np.int32)
+        values = np.array(values, dtype=np.float32) * idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n)).astype(np.float32)
+        norms[norms == 0] = 1
+        return SparseColumns(rows, columns, values / norms[rows], (n, len(vocabulary)))
+
+    def transform(self, text):
+        """Vector for one text"""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        self._fill(vector, Counter(tokenize(text)))
+        return _normalize_rows(vector[np.newaxis])[0]
+
+    def _fill(self, vector, count):
+        vocabulary = self.vocabulary
+        for term, tf in count.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                vector[column] = (1 + math.log(tf)) * self.idf[column]
+
+
+class SparseColumns:
+    """Sparse float32 matrix stored column by column (CSC)
+
+    Column j's rows are indices[indptr[j]:indptr[j + 1]], with their values
+    in data at the same positions.
+    """
+
+    def __init__(self, rows, columns, values, shape):
+        order = np.argsort(columns, kind='stable')
+        self.shape = shape
+        self.indices = rows[order]
+        self.data = values[order].astype(np.float32)
+        self.indptr = np.zeros(shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns, minlength=shape[1]), out=self.indptr[1:])
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.data.nbytes + self.indptr.nbytes
+
+    def dot(self, vector):
+        """Matrix-vector product, reading only the columns where vector is non-zero"""
+        columns = np.flatnonzero(vector)
+        if not len(columns):
+            return np.zeros(self.shape[0], dtype=np.float32)
+        starts, ends = self.indptr[columns], self.indptr[columns + 1]
+        positions = np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+        weights = self.data[positions] * np.repeat(vector[columns], ends - starts)
+        return np.bincount(self.indices[positions], weights=weights, minlength=self.shape[0]).astype(np.float32)
+
+
+class MatcherNotReady(Exception):
+    """Raised by match until the first opportunity vectors are built"""
+
+
+class SpacyVectorizer:
+    """spaCy document vectors; get_nlp returns the loaded pipeline"""
+
+    def __init__(self, get_nlp):
+        self.get_nlp = get_nlp
+
+    def fit_transform(self, texts):
+        nlp = self.get_nlp()
+        # Only the token vectors are needed, so tokenize without running the
+        # pipeline. The pipeline may be shared with the resume parser: it is
+        # never modified here (select_pipes would disable its components for
+        # every thread using it).
+        vectors = [nlp.make_doc(text).vector for text in texts]
+        width = nlp.vocab.vectors_length
+        matrix = np.array(vectors, dtype=np.float32).reshape(len(vectors), width)
+        return _normalize_rows(matrix)
+
+    def transform(self, text):
+        nlp = self.get_nlp()
+        vector = nlp.make_doc(text).vector
+        return _normalize_rows(np.asarray(vector, dtype=np.float32)[np.newaxis])[0]
+
+
+def _normalize_rows(matrix):
+    """Scale rows to unit length so dot products are cosine similarities"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+    return matrix
+
+
+def top_k(scores, k):
+    """Indices of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    # Stable sort keeps store order between equal scores
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def parse_match_limit(value):
+    """Validate the number of matches to return"""
+    if value in (None, ''):
+        return DEFAULT_MATCH_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, MAX_MATCH_LIMIT)
+
+
+class OpportunityMatcher:
+    """Top-k cosine matching of resumes against every opportunity in a store
+
+    make_vectorizer creates a fresh vectorizer for each build, so a match
+    running during a rebuild keeps using a consistent vocabulary and matrix.
+    Builds never run on a request: start_build (called at startup, or by the
+    first match) and every data change start one in a background thread.
+    Matches are answered from the previous build (possibly naming deleted
+    ids) until it is done, and raise MatcherNotReady before the first.
+    """
+
+    def __init__(self, store, make_vectorizer=TfidfVectorizer):
+        self.store = store
+        self.make_vectorizer = make_vectorizer
+        self._built = (None, [], {}, None, None)
+        self._lock = threading.Lock()
+        # Held by the background rebuild while it runs
+        self._rebuilding = threading.Lock()
+
+    def build(self):
+        """Build vectors for the current store version, unless they already are"""
+        with self._lock:
+            version = self.store.version
+            if self._built[0] != version:
+                _, ids = self.store.ordered()
+                records = self.store.get_many(ids)
+                vectorizer = self.make_vectorizer()
+                matrix = vectorizer.fit_transform([opportunity_text(record) for record in records])
+                rows = {doc_id: row for row, doc_id in enumerate(ids)}
+                self._built = (version, list(ids), rows, matrix, vectorizer)
+            return self._built
+
+    def _rebuild(self):
+        try:
+            # Changes made during a build are picked up by building again
+            while self._built[0] != self.store.version:
+                self.build()
+        finally:
+            self._rebuilding.release()
+
+    def start_build(self):
+        """Build the vectors in a background thread, unless one is already running"""
+        if self._rebuilding.acquire(blocking=False):
+            threading.Thread(target=self._rebuild, name='match-rebuild', daemon=True).start()
+
+    @property
+    def ready(self):
+        return self._built[0] is not None
+
+    def refresh(self):
+        """Return (ids, {id: row}, matrix, vectorizer), starting a background rebuild if the store changed
+
+        Raises MatcherNotReady until the first build is done.
+        """
+        built = self._built
+        if built[0] != self.store.version:
+            self.start_build()
+        if built[0] is None:
+            raise MatcherNotReady("Opportunity vectors are still being built; retry shortly")
+        return built[1:]
+
+    def match(self, text, k=DEFAULT_MATCH_LIMIT, exclude=()):
+        """Return [(id, score)] of the k opportunities most similar to text, best first
+
+        Ids in exclude are never returned.
+        """
+        ids, rows, matrix, vectorizer = self.refresh()
+        if not ids:
+            return []
+        scores = matrix.dot(vectorizer.transform(text))
+        excluded = [rows[doc_id] for doc_id in exclude if doc_id in rows]
+        if excluded:
+            scores[excluded] = 0
+        return [(ids[i], float(scores[i])) for i in top_k(scores, k) if scores[i] > 0]
@@ -0,0 +1,102 @@
+"""Cache of ready-to-send opportunity responses
+
+Entries hold serialized JSON bytes (and compressed copies, made on first
+use), keyed by a normalized form of the request. A hit skips the search and
+the serialization. Each entry records the dataset version it was built from,
+and the whole cache is dropped as soon as the version moves on.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from .http_cache import compress
+
+# Request parameters holding free text; these are case- and space-insensitive
+TEXT_PARAMETERS = ('query', 'keywords', 'university', 'department', 'funding', 'tags', 'prefix')
+
+
+def normalize_params(path, params):
+    """Build a cache key from a request path and its (query or JSON) parameters"""
+    items = []
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, (list, tuple)):
+            value = ','.join(str(item) for item in value)
+        value = '' if value is None else str(value)
+        if name in TEXT_PARAMETERS:
+            value = ' '.join(value.lower().split())
+        if value:
+            items.append((name, value))
+    return path, tuple(items)
+
+
+class CachedResponse:
+    """Serialized body plus the headers that belong with it"""
+
+    def __init__(self, body, headers=None):
+        self.body = body
+        self.headers = dict(headers or {})
+        self._encoded = {None: body}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding):
+        """Return the body in the given content coding, compressing only once"""
+        if encoding not in self._encoded:
+            with self._lock:
+                if encoding not in self._encoded:
+                    self._encoded[encoding] = compress(self.body, encoding)
+        return self._encoded[encoding]
+
+
+class ResponseCache:
+    """Bounded LRU of serialized responses with a TTL and version invalidation"""
+
+    def __init__(self, max_entries=1024, ttl=300, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key, version):
+        """Return the CachedResponse for key at this dataset version, or None"""
+        with self._lock:
+            self._check_version(version)
+            item = self._entries.get(key) if version == self.version else None
+            if item is None or item[0] < self.clock():
+                if item is not None:
+                    del self._entries[key]
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return item[1]
+
+    def put(self, key, version, entry):
+        """Store an entry built from the given dataset version"""
+        with self._lock:
+            self._check_version(version)
+            if version != self.version:
+                return  # Built from data that has since changed
+            self._entries[key] = (self.clock() + self.ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "entries": len(self._entries), "version": self.version}
+
+    def _check_version(self, version):
+        """Drop every entry once a newer dataset version is seen"""
+        if self.version is None or version > self.version:
+            if self._entries:
+                self._entries.clear()
+                self.counters["invalidations"] += 1
+            self.version = version
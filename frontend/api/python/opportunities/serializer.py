@@ -0,0 +1,37 @@
+"""JSON serialization of opportunity records and result pages"""
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency, json is used instead
+    orjson = None
+
+
+def dumps(obj, default=None):
+    """Serialize to compact JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, default=default, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def parse_fields(value):
+    """Parse a projection ("id,title,university"); None means every field"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    fields = {field.strip() for field in value if field.strip()}
+    fields.add('id')
+    return fields
+
+
+def project(record, fields):
+    """Return only the requested fields of a record"""
+    if fields is None:
+        return record
+    return {field: value for field, value in record.items() if field in fields}
+
+
+def envelope(data, message="Success", **extra):
+    """Wrap data in the {"message", "data"} envelope used by the serverless API"""
+    return {"message": message, "data": data, **extra}
@@ -1,6 +1,9 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
-import { getOpportunities, advancedSearch } from '../services/api';
+import { getOpportunities, advancedSearch, getSuggestions } from '../services/api';
+
+// Wait this long after the last keystroke before asking for suggestions
+const SUGGEST_DELAY_MS = 150;
 
 const SearchInput = ({ onSearchResults }) => {
   const [query, setQuery] = useState('');
@@ -9,6 +12,32 @@ const SearchInput = ({ onSearchResults }) => {
   const [department, setDepartment] = useState('');
   const [funding, setFunding] = useState('');
   const [isSearching, setIsSearching] = useState(false);
+  const [suggestions, setSuggestions] = useState([]);
+  
+  useEffect(() => {
+    if (query.trim().length < 2) {
+      setSuggestions([]);
+      return undefined;
+    }
+    
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const results = await getSuggestions(query);
+        if (!cancelled) {
+          // The serverless API wraps the list in {"message", "data"}
+          setSuggestions(Array.isArray(results) ? results : results.data || []);
+        }
+      } catch (error) {
+        // Suggestions are optional; keep the search box usable
+      }
+    }, SUGGEST_DELAY_MS);
+    
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query]);
   
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -60,8 +89,15 @@ const SearchInput = ({ onSearchResults }) => {
               value={query}
               onChange={(e) => setQuery(e.target.value)}
               placeholder="Search for PhD opportunities, universities, or research areas..."
+              list="search-suggestions"
+              autoComplete="off"
               className="w-full py-3 px-2 bg-transparent border-none focus:outline-none focus:ring-0 text-gray-900 dark:text-white placeholder-gray-400 dark:placeholder-gray-500 rounded-full"
             />
+            <datalist id="search-suggestions">
+              {suggestions.map((suggestion) => (
+                <option key={`${suggestion.field}:${suggestion.text}`} value={suggestion.text} />
+              ))}
+            </datalist>
           </div><button
             type="submit"
             className="bg-primary hover:bg-primary-dark transition-colors text-white px-8 py-3 rounded-full font-medium ml-2 flex items-center shadow-lg"
@@ -3,11 +3,20 @@ import { supabase } from '../utils/supabaseClient';
 
 const API_URL = process.env.REACT_APP_API_URL || '/api';
 
-// Get all opportunities or filtered by simple query
-export const getOpportunities = async (query = '') => {
+// Get opportunities, optionally filtered by simple query.
+// options: { limit, cursor, fields } - the cursor for the next page is in the
+// X-Next-Cursor response header and the total count in X-Total-Count.
+export const getOpportunities = async (query = '', options = {}) => {
   try {
-    const url = query 
-      ? `${API_URL}/opportunities?query=${encodeURIComponent(query)}` 
+    const params = new URLSearchParams();
+    if (query) params.set('query', query);
+    if (options.limit) params.set('limit', options.limit);
+    if (options.cursor) params.set('cursor', options.cursor);
+    if (options.fields) params.set('fields', [].concat(options.fields).join(','));
+    
+    const queryString = params.toString();
+    const url = queryString
+      ? `${API_URL}/opportunities?${queryString}`
       : `${API_URL}/opportunities`;
     
     const response = await fetch(url);
@@ -39,6 +48,26 @@ export const getOpportunityById = async (id) => {
   }
 };
 
+// Get several opportunities by ID in one request
+export const getOpportunitiesByIds = async (ids) => {
+  try {
+    if (!ids.length) {
+      return [];
+    }
+    
+    const response = await fetch(`${API_URL}/opportunities/batch?ids=${ids.map(encodeURIComponent).join(',')}`);
+    
+    if (!response.ok) {
+      throw new Error(`Error: ${response.status}`);
+    }
+    
+    return await response.json();
+  } catch (error) {
+    console.error('Failed to fetch opportunities by ID:', error);
+    throw error;
+  }
+};
+
 // Advanced search with multiple criteria
 export const advancedSearch = async (searchParams) => {
   try {
@@ -61,29 +90,90 @@ export const advancedSearch = async (searchParams) => {
   }
 };
 
+// Suggest completions for a search-box prefix (titles, universities, departments and tags)
+export const getSuggestions = async (prefix, limit = 8) => {
+  try {
+    const params = new URLSearchParams({ prefix, limit });
+    const response = await fetch(`${API_URL}/suggest?${params.toString()}`);
+    
+    if (!response.ok) {
+      throw new Error(`Error: ${response.status}`);
+    }
+    
+    return await response.json();
+  } catch (error) {
+    console.error("Failed to fetch suggestions:", error);
+    throw error;
+  }
+};
+
+// Saved opportunities go through the backend's /saved endpoints when it
+// serves them (the Flask app; set REACT_APP_SAVED_API=1), so its per-user
+// cache sees every change. Deployments without them, such as the serverless
+// function, read and write the Supabase table directly.
+const SAVED_API = process.env.REACT_APP_SAVED_API === '1';
+
+// Headers authenticating the current user with the backend. The session is
+// read from local storage, so this costs no network round trip.
+const authHeaders = async () => {
+  const { data: { session } } = await supabase.auth.getSession();
+  
+  if (!session) {
+    return null;
+  }
+  
+  return { Authorization: `Bearer ${session.access_token}` };
+};
+
+// The signed-in user, from the local session
+const sessionUser = async () => {
+  const { data: { session } } = await supabase.auth.getSession();
+  return session ? session.user : null;
+};
+
 // Save an opportunity for the current user
 export const saveOpportunity = async (opportunityId, opportunityData) => {
   try {
-    const { data: user } = await supabase.auth.getUser();
+    if (!SAVED_API) {
+      const user = await sessionUser();
+      
+      if (!user) {
+        throw new Error('User not authenticated');
+      }
+
+      const { data, error } = await supabase
+        .from('saved_opportunities')
+        .upsert([
+          { 
+            user_id: user.id,
+            opportunity_id: opportunityId,
+            opportunity_data: opportunityData,
+            saved_at: new Date().toISOString()
+          }
+        ], { onConflict: 'user_id,opportunity_id' });
+      
+      if (error) throw error;
+      
+      return data;
+    }
+
+    const headers = await authHeaders();
     
-    if (!user) {
+    if (!headers) {
       throw new Error('User not authenticated');
     }
 
-    const { data, error } = await supabase
-      .from('saved_opportunities')
-      .insert([
-        { 
-          user_id: user.id,
-          opportunity_id: opportunityId,
-          opportunity_data: opportunityData,
-          saved_at: new Date().toISOString()
-        }
-      ]);
+    const response = await fetch(`${API_URL}/saved/${opportunityId}`, {
+      method: 'PUT',
+      headers: { ...headers, 'Content-Type': 'application/json' },
+      body: JSON.stringify(opportunityData || null),
+    });
     
-    if (error) throw error;
+    if (!response.ok) {
+      throw new Error(`Error: ${response.status}`);
+    }
     
-    return data;
+    return await response.json();
   } catch (error) {
     console.error('Error saving opportunity:', error);
     throw error;
@@ -93,21 +183,40 @@ export const saveOpportunity = async (opportunityId, opportunityData) => {
 // Remove a saved opportunity
 export const unsaveOpportunity = async (opportunityId) => {
   try {
-    const { data: user } = await supabase.auth.getUser();
+    if (!SAVED_API) {
+      const user = await sessionUser();
+      
+      if (!user) {
+        throw new Error('User not authenticated');
+      }
+
+      const { data, error } = await supabase
+        .from('saved_opportunities')
+        .delete()
+        .eq('user_id', user.id)
+        .eq('opportunity_id', opportunityId);
+      
+      if (error) throw error;
+      
+      return data;
+    }
+
+    const headers = await authHeaders();
     
-    if (!user) {
+    if (!headers) {
       throw new Error('User not authenticated');
     }
 
-    const { data, error } = await supabase
-      .from('saved_opportunities')
-      .delete()
-      .eq('user_id', user.id)
-      .eq('opportunity_id', opportunityId);
+    const response = await fetch(`${API_URL}/saved/${opportunityId}`, {
+      method: 'DELETE',
+      headers,
+    });
     
-    if (error) throw error;
+    if (!response.ok) {
+      throw new Error(`Error: ${response.status}`);
+    }
     
-    return data;
+    return await response.json();
   } catch (error) {
     console.error('Error removing saved opportunity:', error);
     throw error;
@@ -117,63 +226,119 @@ export const unsaveOpportunity = async (opportunityId) => {
 // Get all saved opportunities for the current user
 export const getSavedOpportunities = async () => {
   try {
-    const { data: { user } } = await supabase.auth.getUser();
+    if (!SAVED_API) {
+      const user = await sessionUser();
+      
+      if (!user) {
+        throw new Error('User not authenticated');
+      }
+
+      const { data, error } = await supabase
+        .from('saved_opportunities')
+        .select('*')
+        .eq('user_id', user.id)
+        .order('saved_at', { ascending: false });
+      
+      if (error) throw error;
+      
+      return data;
+    }
+
+    const headers = await authHeaders();
     
-    if (!user) {
+    if (!headers) {
       throw new Error('User not authenticated');
     }
 
-    const { data, error } = await supabase
-      .from('saved_opportunities')
-      .select('*')
-      .eq('user_id', user.id)
-      .order('saved_at', { ascending: false });
+    const response = await fetch(`${API_URL}/saved`, { headers });
     
-    if (error) throw error;
+    if (!response.ok) {
+      throw new Error(`Error: ${response.status}`);
+    }
     
-    return data;
+    return await response.json();
   } catch (error) {
     console.error('Error fetching saved opportunities:', error);
     throw error;
   }
 };
 
-// Check if an opportunity is saved by the current user
-export const isOpportunitySaved = async (opportunityId) => {
+// Ids among opportunityIds the user has saved, in one query on the table
+const savedIdsFromSupabase = async (user, opportunityIds) => {
+  const { data, error } = await supabase
+    .from('saved_opportunities')
+    .select('opportunity_id')
+    .eq('user_id', user.id)
+    .in('opportunity_id', opportunityIds);
+  
+  if (error) throw error;
+  
+  return data.map((row) => row.opportunity_id);
+};
+
+// Check which of several opportunities the current user has saved, in one
+// request. Returns { [id]: true/false }; everything is unsaved when logged out.
+export const getSavedStatus = async (opportunityIds) => {
+  const unsaved = Object.fromEntries(opportunityIds.map((id) => [id, false]));
+  
   try {
-    const { data: { user } } = await supabase.auth.getUser();
+    if (!opportunityIds.length) {
+      return unsaved;
+    }
+
+    if (!SAVED_API) {
+      const user = await sessionUser();
+      
+      if (!user) {
+        return unsaved;
+      }
+
+      const saved = await savedIdsFromSupabase(user, opportunityIds);
+      return { ...unsaved, ...Object.fromEntries(saved.map((id) => [id, true])) };
+    }
+
+    const headers = await authHeaders();
     
-    if (!user) {
-      return false; // Not logged in, so not saved
+    if (!headers) {
+      return unsaved;
     }
 
-    const { data, error } = await supabase
-      .from('saved_opportunities')
-      .select('id')
-      .eq('user_id', user.id)
-      .eq('opportunity_id', opportunityId)
-      .single();
+    const response = await fetch(`${API_URL}/saved/status`, {
+      method: 'POST',
+      headers: { ...headers, 'Content-Type': 'application/json' },
+      body: JSON.stringify({ ids: opportunityIds }),
+    });
     
-    if (error) {
-      if (error.code === 'PGRST116') {
-        return false; // No match found
-      }
-      throw error;
+    if (!response.ok) {
+      throw new Error(`Error: ${response.status}`);
     }
     
-    return Boolean(data);
+    // Only take a flag for each requested id, so an unexpected body (an
+    // error envelope, say) cannot add keys to the map
+    const flags = await response.json();
+    return Object.fromEntries(opportunityIds.map((id) => [id, flags[id] === true]));
   } catch (error) {
-    console.error('Error checking if opportunity is saved:', error);
-    return false;
+    console.error('Error checking saved opportunities:', error);
+    return unsaved;
   }
 };
 
+// Check if an opportunity is saved by the current user. Prefer getSavedStatus
+// for lists, which checks every card in one request.
+export const isOpportunitySaved = async (opportunityId) => {
+  const status = await getSavedStatus([opportunityId]);
+  return Boolean(status[opportunityId]);
+};
+
 export default {
   getOpportunities,
   getOpportunityById,
+  getOpportunitiesByIds,
   advancedSearch,
+  getSuggestions,
   saveOpportunity,
   unsaveOpportunity,
   getSavedOpportunities,
+  getSavedStatus,
   isOpportunitySaved
 };